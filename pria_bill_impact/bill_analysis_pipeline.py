@@ -0,0 +1,156 @@
+import queue
+import threading
+import time
+
+
+class BillAnalysisPipeline:
+    """
+    Analyzes bills in three stages connected by bounded queues, each with its own worker threads:
+
+        retrieval (citation lookups + batched FAISS search)
+            → LLM (section summaries and demographics for one bill, waited on together)
+            → write (parse the responses, assemble the result, append it to the results log)
+
+    CPU-bound embedding for upcoming bills overlaps the network-bound LLM calls of earlier ones, and
+    the bounded queues keep at most a few bills waiting between stages instead of the whole list.
+    How many LLM calls actually run at once is still governed by the LLM client's request engine.
+
+    A bill whose stage fails (including an LLM call that still fails after its retries) is logged and
+    dropped; it has no result in the log and is picked up by the next run. A failed retrieval batch is
+    first retried bill by bill, so only the failing bill is dropped.
+    """
+
+    _DONE = object()  # Sentinel telling a stage worker its input is exhausted
+
+    def __init__(self, analyzer, retrieval_workers=1, llm_workers=4, write_workers=1, retrieval_batch_size=8,
+                 queue_size=16):
+        """
+        Args:
+            analyzer (BillTextAnalyzer): Provides retrieval, LLM submission, result assembly and the result sink.
+            retrieval_workers (int): Threads running retrieval, each on retrieval_batch_size bills at a time.
+            llm_workers (int): Bills whose LLM calls are in flight at once.
+            write_workers (int): Threads parsing responses and writing results.
+            retrieval_batch_size (int): Bills per FAISS search batch.
+            queue_size (int): Capacity of each queue between stages.
+        """
+        self.analyzer = analyzer
+        self.retrieval_workers = retrieval_workers
+        self.llm_workers = llm_workers
+        self.write_workers = write_workers
+        self.retrieval_batch_size = retrieval_batch_size
+        self.queue_size = queue_size
+
+        self.stats_lock = threading.Lock()
+        self.stats = {}
+
+    def _record(self, stage, seconds, items=1, failed=False):
+        with self.stats_lock:
+            stage_stats = self.stats.setdefault(stage, {"items": 0, "failed": 0, "busy_seconds": 0.0})
+            stage_stats["failed" if failed else "items"] += items
+            stage_stats["busy_seconds"] += seconds
+
+    def _retrieve(self, bill_batch, outbox):
+        start_time = time.perf_counter()
+        try:
+            bill_sections = self.analyzer.find_similar_us_code_sections_batch(bill_batch)
+        except Exception as e:
+            if len(bill_batch) == 1:
+                print(f"❌ Retrieval failed for {bill_batch[0][0]}: {e}")
+                self._record("retrieval", time.perf_counter() - start_time, failed=True)
+                return
+
+            # Retry the bills one at a time, so only the bill that actually fails is dropped
+            print(f"⚠️ Batch retrieval failed ({e}), retrying its {len(bill_batch)} bills one at a time...")
+            self._record("retrieval", time.perf_counter() - start_time, items=0)
+            for bill_item in bill_batch:
+                self._retrieve([bill_item], outbox)
+            return
+        self._record("retrieval", time.perf_counter() - start_time, len(bill_batch))
+
+        for bill_id, bill_text in bill_batch:
+            outbox.put((bill_id, bill_text, bill_sections[bill_id]))
+
+    def _call_llm(self, item, outbox):
+        bill_id, bill_text, similar_sections = item
+        start_time = time.perf_counter()
+        try:
+            pending = self.analyzer.submit_bill_analysis(bill_id, bill_text, similar_sections)
+            for future in pending["summary_futures"] + [pending["demographics_future"]]:
+                future.result()  # Raises here, in this stage, if the call failed
+        except Exception as e:
+            print(f"❌ LLM calls failed for {bill_id}: {e}")
+            self._record("llm", time.perf_counter() - start_time, failed=True)
+            return
+        self._record("llm", time.perf_counter() - start_time)
+
+        outbox.put((bill_id, pending))
+
+    def _write(self, item, outbox):
+        bill_id, pending = item
+        start_time = time.perf_counter()
+        try:
+            result = self.analyzer.collect_bill_analysis(bill_id, pending)  # Its futures are already done
+            self.analyzer.result_sink.write(bill_id, result)
+        except Exception as e:
+            print(f"❌ Writing the result of {bill_id} failed: {e}")
+            self._record("write", time.perf_counter() - start_time, failed=True)
+            return
+        self._record("write", time.perf_counter() - start_time)
+        print(f"Finished analyzing Bill: {bill_id}")
+
+    def _start_stage(self, name, handler, workers, inbox, outbox):
+        def work():
+            while True:
+                item = inbox.get()
+                if item is self._DONE:
+                    return
+                handler(item, outbox)
+
+        threads = [threading.Thread(target=work, name=f"pipeline-{name}-{i}", daemon=True) for i in range(workers)]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def run(self, bill_items):
+        """
+        Analyzes bill_items and appends each result to the analyzer's result sink as soon as it is ready.
+
+        Args:
+            bill_items (Iterable[Tuple[str, str]]): (bill_id, bill_text) pairs. Read lazily, so a generator works.
+
+        Returns:
+            dict: Per-stage {"items", "failed", "busy_seconds"}, plus the total "wall_seconds".
+        """
+        start_time = time.perf_counter()
+        retrieval_queue = queue.Queue(self.queue_size)
+        llm_queue = queue.Queue(self.queue_size)
+        write_queue = queue.Queue(self.queue_size)
+
+        stages = [
+            (self._start_stage("retrieval", self._retrieve, self.retrieval_workers, retrieval_queue, llm_queue),
+             llm_queue, self.llm_workers),
+            (self._start_stage("llm", self._call_llm, self.llm_workers, llm_queue, write_queue),
+             write_queue, self.write_workers),
+            (self._start_stage("write", self._write, self.write_workers, write_queue, None), None, 0),
+        ]
+
+        bill_batch = []
+        for bill_item in bill_items:
+            bill_batch.append(bill_item)
+            if len(bill_batch) == self.retrieval_batch_size:
+                retrieval_queue.put(bill_batch)
+                bill_batch = []
+        if bill_batch:
+            retrieval_queue.put(bill_batch)
+        for _ in range(self.retrieval_workers):
+            retrieval_queue.put(self._DONE)
+
+        # Once a stage's workers are done, nothing more can reach the next stage, so it can be told to finish
+        for threads, next_queue, next_workers in stages:
+            for thread in threads:
+                thread.join()
+            for _ in range(next_workers):
+                next_queue.put(self._DONE)
+
+        self.stats["wall_seconds"] = time.perf_counter() - start_time
+        return self.stats
@@ -1,5 +1,6 @@
 import time
 import json
+import argparse
 from pathlib import Path
 from models.us_code_matcher import USCodeMatcher
 from llm.anthropic_client import ClaudeLLM
@@ -7,16 +8,27 @@ from utils.file_utils import load_json
 from models.embedder_and_faiss_indexer import EmbeddingFAISSManager
 from models.us_code_matcher import USCodeMatcher
 from llm.anthropic_client import ClaudeLLM
+from llm.fake_anthropic_client import FakeAnthropicClient
+from llm.section_excerpts import SectionExcerptCache
 from utils.file_utils import load_json
 from utils.text_utils import parse_textblock
 from models.demographic_matcher import DemographicMatcher
 from utils.text_utils import extract_us_code_mentions  
+from utils.text_utils import clean_section_number
+from utils.us_code_store import USCodeStore
+from utils.bill_mapping_cache import BillUSCodeMappingCache
+from utils.result_sink import AnalysisResultSink
+from bill_analysis_pipeline import BillAnalysisPipeline
 
 
 # File Paths
 OUTPUT_DIR = Path("data_output")
-PROCESSED_BILLS_FILE = OUTPUT_DIR / "processed_bills_list_for_impact_analysis.json"
 BILL_IMPACT_FILE = OUTPUT_DIR / "bill_impact_analysis_haiku.json"
+BILL_IMPACT_LOG_FILE = OUTPUT_DIR / "bill_impact_analysis_haiku.jsonl"  # Per-bill results, exported to BILL_IMPACT_FILE
+US_CODE_SECTIONS_FILE = Path("data_processing/data_output/processed_uscode_sections.json")
+BILL_DATA_FILE = Path("data_processing/data_output/bill_data_output.json")
+PUBLIC_LAW_MAPPING_FILE = OUTPUT_DIR / "public_law_to_us_code_mapping.json"
+BILL_TO_US_CODE_CACHE_FILE = OUTPUT_DIR / "bill_to_us_code_mapping.json"
 
 
 TARGET_BILLS = [
@@ -42,74 +54,126 @@ TARGET_BILLS = [
     (118,"hr",9881)
 ]
 
+def load_bill_list(bill_list_path):
+    """
+    Reads the bills to analyze from a file: either a JSON list of bill ids ("118_hr_1046") or
+    [congress, bill_type, bill_number] triples, or plain text with one bill per line as
+    "118_hr_1046" or "118 hr 1046" (blank lines and # comments are ignored).
+
+    Returns:
+        List[str]: Bill ids.
+    """
+    with open(bill_list_path, "r", encoding="utf-8") as f:
+        content = f.read()
+
+    if content.lstrip().startswith("["):
+        entries = json.loads(content)
+    else:
+        entries = [line.split("#")[0].strip() for line in content.splitlines()]
+        entries = [entry.replace(" ", "_") if " " in entry else entry for entry in entries if entry]
+
+    return [
+        entry if isinstance(entry, str) else f"{entry[0]}_{str(entry[1]).lower()}_{entry[2]}"
+        for entry in entries
+    ]
+
+
+def query_bills(bills, congresses=None, bill_types=None, became_law=None):
+    """
+    Selects bill ids from the fetched bill data (congress_bill_processor's bill_data_output.json).
+
+    Args:
+        bills (dict): {bill_id: bill_data}.
+        congresses (List[int]): Keep only these Congresses (None keeps all).
+        bill_types (List[str]): Keep only these bill types, e.g. ["hr", "s"] (None keeps all).
+        became_law (bool): Keep only bills that did (True) or didn't (False) become law (None keeps all).
+
+    Returns:
+        List[str]: Bill ids, in the order they appear in the bill data.
+    """
+    congresses = {str(congress) for congress in congresses} if congresses else None
+    bill_types = {bill_type.lower() for bill_type in bill_types} if bill_types else None
+
+    selected = []
+    for bill_id, bill_data in bills.items():
+        congress, bill_type, _ = bill_id.split("_", 2)
+        if congresses and congress not in congresses:
+            continue
+        if bill_types and bill_type not in bill_types:
+            continue
+        if became_law is not None and bool(bill_data.get("became_law")) != became_law:
+            continue
+        selected.append(bill_id)
+    return selected
+
+
 class BillTextAnalyzer:
     """Processes and analyzes Bill vs Code for impact assessment. Main Class for assignment"""
 
-    def __init__(self):
-        """Initialize components for bill-to-code matching and LLM processing."""
+    def __init__(self, llm_client=None, faiss_min_score=None):
+        """
+        Initialize components for bill-to-code matching and LLM processing.
+
+        Args:
+            llm_client (ClaudeLLM): Optional pre-built LLM client, e.g. one wrapping FakeAnthropicClient for offline runs.
+            faiss_min_score (float): FAISS fallback matches scoring below this are dropped before any LLM call.
+        """
         print("Initializing LegalTextProcessor")
 
 
 
         # Load LLM Client for Summarization
-        self.llm_client = ClaudeLLM()
+        self.llm_client = llm_client or ClaudeLLM()
+        self.faiss_min_score = faiss_min_score
 
         # Load Data Files
-        self.public_law_mapping = load_json("data_output/public_law_to_us_code_mapping.json")
-        self.bills = load_json("data_processing/data_output/bill_data_output.json")
-        self.us_code_sections = load_json("data_processing/data_output/processed_uscode_sections.json")
+        self.public_law_mapping = load_json(PUBLIC_LAW_MAPPING_FILE)
+        self.bills = load_json(BILL_DATA_FILE)
+        # Sections are read from a SQLite store on demand instead of loading the whole JSON (see USCodeStore)
+        self.us_code_sections = USCodeStore.load_or_build(US_CODE_SECTIONS_FILE)
         self.us_code_matcher = USCodeMatcher(self.us_code_sections)
 
-        self.demographic_matcher = DemographicMatcher()
-
-        #load processed bills log
-        self.processed_bills = self.load_processed_bills()
+        # Bill → U.S. Code mapping for passed bills, computed once and cached on disk
+        self.bill_mapping_cache = BillUSCodeMappingCache(
+            BILL_TO_US_CODE_CACHE_FILE, BILL_DATA_FILE, PUBLIC_LAW_MAPPING_FILE
+        )
+        self.bill_mapping_cache.load_or_build(self.bills, self.public_law_mapping)
 
-    def load_processed_bills(self):
-        """Loads previously analyzed bills to avoid duplication."""
-        try:
-            with open(PROCESSED_BILLS_FILE, "r", encoding="utf-8") as f:
-                return set(json.load(f).get("processed_bills", []))  # Store as a set for fast lookup
-        except FileNotFoundError:
-            return set()
+        self.demographic_matcher = DemographicMatcher()
 
+        # Results log; the bills in it are the ones already analyzed
+        self.result_sink = AnalysisResultSink(BILL_IMPACT_LOG_FILE, legacy_results_path=BILL_IMPACT_FILE)
+        self.processed_bills = self.result_sink.bill_ids
 
-    def save_processed_bill(self, bill_id):
-        """Saves a bill ID to the processed log file."""
-        self.processed_bills.add(bill_id)
-        with open(PROCESSED_BILLS_FILE, "w", encoding="utf-8") as f:
-            json.dump({"processed_bills": list(self.processed_bills)}, f, indent=4)
+    def save_results(self, results):
+        """Appends each bill's result to the results log, which also marks the bill as processed."""
+        for bill_id, result in results.items():
+            self.result_sink.write(bill_id, result)
 
     def get_exact_us_code_sections_for_passed_bills(self):
         """
         Matches bills with valid public law numbers to their corresponding U.S. Code sections.
+        The mapping is precomputed at startup (see BillUSCodeMappingCache), so this is free to call per bill.
         
         Returns:
             dict: A mapping of {bill_id: {"public_law_number": X, "us_code_sections": [...]}}
         """
-        bill_to_us_code = {}
-
-        for bill_id, bill_data in self.bills.items():
-            public_law_number = bill_data.get("public_law_number")
-
-            if public_law_number and public_law_number in self.public_law_mapping:
-                us_code_sections = self.public_law_mapping[public_law_number].get("us_code_sections", [])
-
-                bill_to_us_code[bill_id] = {
-                    "public_law_number": public_law_number,
-                    "us_code_sections": us_code_sections
-                }
+        return self.bill_mapping_cache.mapping
 
-        return bill_to_us_code
+    def add_bills(self, new_bills):
+        """Adds newly fetched bills and updates the cached bill → U.S. Code mapping for just those bills."""
+        self.bills.update(new_bills)
+        self.bill_mapping_cache.update_bills(new_bills, self.public_law_mapping)
 
 
-    def find_similar_us_code_sections(self, bill_id, bill_text, top_k=2):
+    def find_similar_us_code_sections(self, bill_id, bill_text, top_k=2, use_faiss=True):
         """
         Finds the most relevant U.S. Code sections for a bill.
 
         - If the bill has been passed into law, it directly uses the mapped U.S. Code sections from get_exact_us_code_sections_for_passed_bills.
         - If it has not, first, checks if the bill explicitly mentions U.S. Code sections in the text.
-        - If no direct mentions, uses FAISS similarity search.
+        - If no direct mentions, uses FAISS similarity search (unless use_faiss is False, which
+          find_similar_us_code_sections_batch uses to run the fallback for many bills at once).
 
         Returns:
             List[Dict]: List of dictionaries with:
@@ -131,19 +195,15 @@ class BillTextAnalyzer:
                 section_number = clean_section_number(sec.get("section"))  # ✅ Clean section number
 
                 # 🔍 Try to find exact match in U.S. Code database
-                for us_code_key, us_code_data in self.us_code_sections.items():
-                    if (
-                        str(us_code_data.get("title_number")) == str(title_number) and
-                        str(us_code_data.get("section_number")) == str(section_number)
-                    ):
-                        matched_sections.append({
-                            "section_id": f"{title_number} U.S.C. {section_number}",
-                            "title_number": title_number,
-                            "section_number": section_number,
-                            "us_code_text": us_code_data.get("content", "No original text available."),  # ✅ Extract text
-                            "similarity_score": 1.0,  # ✅ Exact match gets full confidence
-                            "match_type": "passed_law_direct_mapping"
-                        })
+                for us_code_key, us_code_data in self.us_code_sections.lookup(title_number, section_number):
+                    matched_sections.append({
+                        "section_id": f"{title_number} U.S.C. {section_number}",
+                        "title_number": title_number,
+                        "section_number": section_number,
+                        "us_code_text": us_code_data.get("content", "No original text available."),  # ✅ Extract text
+                        "similarity_score": 1.0,  # ✅ Exact match gets full confidence
+                        "match_type": "passed_law_direct_mapping"
+                    })
 
 
         # Second, check mentions of U.S. Code sections directly in bill text    
@@ -154,74 +214,111 @@ class BillTextAnalyzer:
             section_number = mention["section_number"]
 
             # 🔍 Try to find exact match in U.S. Code database
-            for us_code_key, us_code_data in self.us_code_sections.items():
-                if (
-                    str(us_code_data.get("title_number")) == str(title_number) and
-                    str(us_code_data.get("section_number")) == str(section_number)
-                ):
-                    matched_sections.append({
-                        "section_id": f"{title_number} U.S.C. {section_number}",
-                        "title_number": title_number,
-                        "section_number": section_number,
-                        "us_code_text": us_code_data.get("content", "No original text available."),  # ✅ Extract text directly
-                        "similarity_score": 1.0,  # ✅ Exact match gets full confidence
-                        "match_type": "mentioned_in_bill_mapping"
-                    })
+            for us_code_key, us_code_data in self.us_code_sections.lookup(title_number, section_number):
+                matched_sections.append({
+                    "section_id": f"{title_number} U.S.C. {section_number}",
+                    "title_number": title_number,
+                    "section_number": section_number,
+                    "us_code_text": us_code_data.get("content", "No original text available."),  # ✅ Extract text directly
+                    "similarity_score": 1.0,  # ✅ Exact match gets full confidence
+                    "match_type": "mentioned_in_bill_mapping"
+                })
 
 
         # Third, If no direct matches found, fallback to FAISS search
-        if not matched_sections:
-            matched_sections = self.us_code_matcher.search_similar_sections(bill_text, top_k=top_k)
+        if not matched_sections and use_faiss:
+            matched_sections = self.us_code_matcher.search_similar_sections(
+                bill_text, top_k=top_k, min_score=self.faiss_min_score
+            )
 
         return matched_sections[:top_k]
 
+    def find_similar_us_code_sections_batch(self, bill_items, top_k=2):
+        """
+        Same as find_similar_us_code_sections for many bills at once. Direct mappings and mentions are
+        resolved per bill, and every bill that needs the FAISS fallback is searched in one vectorized pass.
 
-    def analyze_modifications(self, bill_id, bill_text):
-        """Finds relevant U.S. Code sections and analyzes the impact of the bill."""
+        Args:
+            bill_items (List[Tuple[str, str]]): (bill_id, bill_text) pairs.
 
-        similar_sections = self.find_similar_us_code_sections(bill_id, bill_text)
+        Returns:
+            dict: {bill_id: matched sections}
+        """
+        matched = {bill_id: self.find_similar_us_code_sections(bill_id, bill_text, top_k=top_k, use_faiss=False)
+                   for bill_id, bill_text in bill_items}
+
+        fallback_items = [(bill_id, bill_text) for bill_id, bill_text in bill_items if not matched[bill_id]]
+        if fallback_items:
+            fallback_results = self.us_code_matcher.search_similar_sections_batch(
+                [bill_text for _, bill_text in fallback_items], top_k=top_k, min_score=self.faiss_min_score
+            )
+            for (bill_id, _), sections in zip(fallback_items, fallback_results):
+                matched[bill_id] = sections[:top_k]
+
+        return matched
+
+
+    def submit_bill_analysis(self, bill_id, bill_text, similar_sections=None):
+        """
+        Finds relevant U.S. Code sections and submits every LLM call for the bill (one summary per
+        section plus the demographics call) to the LLM request engine without waiting on them.
+
+        Args:
+            similar_sections (List[Dict]): Sections already found for this bill (e.g. by
+                                           find_similar_us_code_sections_batch). Looked up if not given.
+
+        Returns:
+            dict: Pending futures for the bill, to be passed to collect_bill_analysis.
+        """
+        if similar_sections is None:
+            similar_sections = self.find_similar_us_code_sections(bill_id, bill_text)
 
         became_law = self.bills.get(bill_id, {}).get("became_law", False)
 
-        modification_summaries = []
-        
+        summary_futures = []
+
         for section_info in similar_sections:
             section_id = section_info["section_id"]
-            similarity_score = section_info["similarity_score"]
-            match_type = section_info["match_type"]
             original_text = section_info["us_code_text"]
 
-
             if not original_text or original_text == "No original text available.":
                 print(f"⚠️ No official U.S. Code text found for {section_id}.")
-                
-
 
             # Analyze modifications using LLM
-            summary = self.llm_client.summarize_modification(
-                original_text, bill_text, section_id, became_law
-            )
+            summary_futures.append(self.llm_client.submit(
+                self.llm_client.summarize_modification, original_text, bill_text, section_id, became_law
+            ))
+
+        # ✅ New: Let Claude determine affected demographic groups
+        print(f"🔎 Asking LLM to determine affected demographics for {bill_id}...")
+        demographics_future = self.llm_client.submit(
+            self.llm_client.identify_affected_demographics, bill_text, similar_sections
+        )
+
+        return {
+            "similar_sections": similar_sections,
+            "summary_futures": summary_futures,
+            "demographics_future": demographics_future
+        }
+
+    def collect_bill_analysis(self, bill_id, pending):
+        """Waits for a bill's LLM calls to finish and assembles its analysis result."""
+        modification_summaries = []
 
-            parsed_summary = parse_textblock(summary)
+        for section_info, summary_future in zip(pending["similar_sections"], pending["summary_futures"]):
+            parsed_summary = parse_textblock(summary_future.result())
 
             modification_summaries.append({
-                "us_code_section": section_id,
-                "similarity_score": similarity_score,
-                "match_type": match_type,
+                "us_code_section": section_info["section_id"],
+                "similarity_score": section_info["similarity_score"],
+                "match_type": section_info["match_type"],
                 "modification_summary": parsed_summary
             })
 
         bill_title = self.bills.get(bill_id, {}).get("title", "Unknown Title")
         became_law = self.bills.get(bill_id, {}).get("became_law", "Unknown Title")
 
-
-        # ✅ New: Let Claude determine affected demographic groups
-        print(f"🔎 Asking LLM to determine affected demographics for {bill_id}...")
-        demographic_results = self.llm_client.identify_affected_demographics(
-            bill_text, similar_sections
-        )
-
-        parsed_demographic_results = parse_textblock(demographic_results)
+        parsed_demographic_results = parse_textblock(pending["demographics_future"].result())
 
         return {
             "title": bill_title,
@@ -239,29 +336,138 @@ class BillTextAnalyzer:
 
         #print(f"⏳ Bill analysis completed in {time.time() - start_time:.2f} seconds.")
 
-if __name__ == "__main__":
-    processor = BillTextAnalyzer()
 
-    results = {}
-    bill_limit = 20  
-    bill_count = 0  
+    def analyze_modifications(self, bill_id, bill_text):
+        """Finds relevant U.S. Code sections and analyzes the impact of the bill."""
+        return self.collect_bill_analysis(bill_id, self.submit_bill_analysis(bill_id, bill_text))
+
+    def analyze_bills_in_batch(self, bill_items, poll_interval=60):
+        """
+        Batch mode for large overnight runs: builds every summarize_modification and
+        identify_affected_demographics prompt for all bills up front, submits them through the
+        Message Batches API, and parses results as they stream back.
+
+        Args:
+            bill_items (List[Tuple[str, str]]): (bill_id, bill_text) pairs.
+            poll_interval (float): Seconds between batch status checks.
+
+        Returns:
+            dict: {bill_id: analysis result}, same format as analyze_modifications. Bills with a request that
+                  failed in the batch are left out, so they have no result and are picked up by the next run.
+        """
+        prompts = {}
+        systems = {}
+        parsed_responses = {}
+        prompt_bills = {}  # custom_id → bill_id
+        failed_bills = set()
+
+        bill_sections = self.find_similar_us_code_sections_batch(bill_items)
+
+        for bill_id, bill_text in bill_items:
+            similar_sections = bill_sections[bill_id]
+            became_law = self.bills.get(bill_id, {}).get("became_law", False)
+
+            for i, section_info in enumerate(similar_sections):
+                custom_id = f"{bill_id}-section-{i}"
+                prompt = self.llm_client.build_modification_prompt(
+                    section_info["us_code_text"], bill_text, section_info["section_id"], became_law
+                )
+
+                if prompt is None:
+                    parsed_responses[custom_id] = parse_textblock("No valid U.S. Code or bill text found.")
+                else:
+                    prompts[custom_id] = prompt
+                    prompt_bills[custom_id] = bill_id
+
+            prompts[f"{bill_id}-demographics"] = self.llm_client.build_demographics_prompt(bill_text, similar_sections)
+            systems[f"{bill_id}-demographics"] = self.llm_client.get_demographics_system_prompt()
+            prompt_bills[f"{bill_id}-demographics"] = bill_id
+
+        print(f"📦 Built {len(prompts)} prompts for {len(bill_items)} bills.")
+
+        for custom_id, content in self.llm_client.run_batch(prompts, poll_interval=poll_interval, systems=systems):
+            if content is None:
+                failed_bills.add(prompt_bills[custom_id])
+            else:
+                parsed_responses[custom_id] = parse_textblock(content)
 
-    # Load previous analysis results if available
-    try:
-        with open(BILL_IMPACT_FILE, "r", encoding="utf-8") as f:
-            results = json.load(f)
-    except FileNotFoundError:
         results = {}
+        for bill_id, similar_sections in bill_sections.items():
+            if bill_id in failed_bills:
+                print(f"❌ Batch requests failed for {bill_id}, leaving it for the next run.")
+                continue
+            results[bill_id] = {
+                "title": self.bills.get(bill_id, {}).get("title", "Unknown Title"),
+                "became_law": self.bills.get(bill_id, {}).get("became_law", "Unknown Title"),
+                "legal_modifications": [
+                    {
+                        "us_code_section": section_info["section_id"],
+                        "similarity_score": section_info["similarity_score"],
+                        "match_type": section_info["match_type"],
+                        "modification_summary": parsed_responses.get(f"{bill_id}-section-{i}", {})
+                    }
+                    for i, section_info in enumerate(similar_sections)
+                ],
+                "matched_demographics": parsed_responses.get(f"{bill_id}-demographics", {})
+            }
+
+        return results
 
-    for congress, bill_type, bill_number in TARGET_BILLS:
-        bill_id = f"{congress}_{bill_type}_{bill_number}"
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analyze bills against the U.S. Code and affected demographics.")
+    parser.add_argument("--batch", action="store_true", help="Submit all LLM prompts through the Message Batches API.")
+    parser.add_argument("--fake-llm", action="store_true", help="Use an offline fake Claude client (for testing).")
+    parser.add_argument("--min-score", type=float, default=None,
+                        help="Minimum FAISS similarity for fallback matches (e.g. 0.3 with a cosine index).")
+    parser.add_argument("--section-excerpts", action="store_true",
+                        help="Send only the passages of long U.S. Code sections relevant to each bill.")
+    parser.add_argument("--excerpt-tokens", type=int, default=1500,
+                        help="With --section-excerpts, sections longer than this many tokens are excerpted down to it.")
+
+    bill_selection = parser.add_argument_group("bills to analyze (default: TARGET_BILLS)")
+    bill_selection.add_argument("--bills-file", help="File listing bill ids, see load_bill_list.")
+    bill_selection.add_argument("--congress", type=int, nargs="+", help="Analyze the fetched bills of these Congresses.")
+    bill_selection.add_argument("--bill-types", nargs="+", help="With --congress, only these bill types (e.g. hr s).")
+    bill_selection.add_argument("--became-law", action="store_true", help="With --congress, only bills that became law.")
+    bill_selection.add_argument("--limit", type=int, default=None, help="Analyze at most this many pending bills.")
+
+    pipeline_options = parser.add_argument_group("pipeline")
+    pipeline_options.add_argument("--retrieval-workers", type=int, default=1, help="Threads running citation lookups and FAISS search.")
+    pipeline_options.add_argument("--llm-workers", type=int, default=4, help="Bills whose LLM calls are in flight at once.")
+    pipeline_options.add_argument("--write-workers", type=int, default=1, help="Threads parsing responses and writing results.")
+    pipeline_options.add_argument("--retrieval-batch-size", type=int, default=8, help="Bills per FAISS search batch.")
+    pipeline_options.add_argument("--queue-size", type=int, default=16, help="Capacity of each queue between stages.")
+    args = parser.parse_args()
+
+    section_excerpts = SectionExcerptCache(max_tokens=args.excerpt_tokens) if args.section_excerpts else None
+
+    # Fake responses must never end up in the on-disk response cache, so it is off in fake mode, and
+    # fake calls return instantly, so the API rate limits are raised far beyond anything a run can reach
+    processor = BillTextAnalyzer(
+        ClaudeLLM(client=FakeAnthropicClient(), use_cache=False, section_excerpts=section_excerpts,
+                  requests_per_minute=10 ** 9, tokens_per_minute=10 ** 12) if args.fake_llm
+        else ClaudeLLM(section_excerpts=section_excerpts),
+        faiss_min_score=args.min_score
+    )
+
+    if args.bills_file:
+        bill_ids = load_bill_list(args.bills_file)
+    elif args.congress:
+        bill_ids = query_bills(processor.bills, args.congress, args.bill_types, True if args.became_law else None)
+    else:
+        bill_ids = [f"{congress}_{bill_type}_{bill_number}" for congress, bill_type, bill_number in TARGET_BILLS]
+
+    # Gather bills to analyze
+    pending_bills = []
+
+    for bill_id in bill_ids:
+        if args.limit is not None and len(pending_bills) >= args.limit:
+            break
 
         if bill_id in processor.processed_bills:
             print(f"🚫 Skipping {bill_id}, already analyzed.")
             continue  
 
-        print(f"\n🔍 Processing Bill: {bill_id}")
-
         bill_data = processor.bills.get(bill_id, {})
         bill_text = bill_data.get("bill_text_raw", "")
 
@@ -269,24 +475,35 @@ if __name__ == "__main__":
             print(f"Skipping {bill_id}, no bill text available.")
             continue
 
-        results[bill_id] = processor.analyze_modifications(bill_id, bill_text)
-        processor.save_processed_bill(bill_id)  # Log bill as processed
-        print(f"Finished analyzing Bill: {bill_id}")
+        pending_bills.append((bill_id, bill_text))
+
+    if args.batch and pending_bills:
+        # One batch job for every pending bill; results come back together once the batch ends
+        processor.save_results(processor.analyze_bills_in_batch(pending_bills, poll_interval=1 if args.fake_llm else 60))
+        pending_bills = []
 
-        bill_count += 1  
+    if pending_bills:
+        # Retrieval → LLM → writing, with each bill's result logged as soon as it is ready
+        print(f"\n🔍 Analyzing {len(pending_bills)} bills...")
+        pipeline = BillAnalysisPipeline(
+            processor, retrieval_workers=args.retrieval_workers, llm_workers=args.llm_workers,
+            write_workers=args.write_workers, retrieval_batch_size=args.retrieval_batch_size, queue_size=args.queue_size
+        )
+        print(f"⏱️ Pipeline stages: {pipeline.run(pending_bills)}")
 
-        # Save progress every 10 bills in case of API errors
-        if bill_count % 10 == 0:
-            print(" Saving progress...")
-            with open(BILL_IMPACT_FILE, "w", encoding="utf-8") as f:
-                json.dump(results, f, indent=4)
+    processor.llm_client.close()
 
-    # Final save after processing
-    with open(BILL_IMPACT_FILE, "w", encoding="utf-8") as f:
-        json.dump(results, f, indent=4)
+    # Export the legacy {bill_id: result} JSON from the results log
+    processor.result_sink.export(BILL_IMPACT_FILE)
 
     print(f"\nAnalysis complete! Results saved to {BILL_IMPACT_FILE}")
 
+    if processor.llm_client.response_cache:
+        print(f"💾 LLM response cache: {processor.llm_client.response_cache.stats()}")
 
+    if section_excerpts:
+        print(f"✂️ Section excerpts: {section_excerpts.stats()}")
 
-
+    embedding_cache = processor.us_code_matcher.us_code_faiss.embedding_cache
+    if embedding_cache is not None:
+        print(f"💾 Embedding cache: {embedding_cache.stats()}")
@@ -8,66 +8,357 @@ and timeouts.
 import requests
 import time
 import re
+import os
 import json
+import gzip
+import hashlib
+import sqlite3
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from lxml import html
-from datetime import datetime
+from datetime import datetime, timezone
+from requests.adapters import HTTPAdapter
 from typing import Dict, List, Optional
 
 # Constants
 API_KEY = "pfzSh7rlXaccGCDuMyhWGejcSFqIBkFKHWkxphlo"
-BASE_URL = "https://api.congress.gov/v3"
+# Overridable so ingestion can run against mock_congress_server.py
+BASE_URL = os.environ.get("CONGRESS_API_BASE_URL", "https://api.congress.gov/v3")
+REQUESTS_PER_HOUR = 5000  # Congress.gov API key quota
 
 # File Paths
-OUTPUT_DIR = Path(__file__).parent / "data_output"
-PROCESSED_BILLS_FILE = OUTPUT_DIR / "processed_bills.json"
-BILL_DATA_FILE = OUTPUT_DIR / "bill_data_118.json"
-OFFSET_FILE = OUTPUT_DIR / "last_offset.json"
+OUTPUT_DIR = Path(os.environ.get("CONGRESS_OUTPUT_DIR", Path(__file__).parent / "data_output"))
+BILL_STORE_FILE = OUTPUT_DIR / "bill_data.jsonl"
+BILL_DATA_OUTPUT_FILE = OUTPUT_DIR / "bill_data_output.json"  # Consolidated bills, read by BillTextAnalyzer
+BILL_DATA_FILE = OUTPUT_DIR / "bill_data_118.json"  # Written by earlier versions, imported into the bill store once
+CHECKPOINT_FILE = OUTPUT_DIR / "listing_checkpoints.json"
+TEXT_CACHE_DIR = OUTPUT_DIR / "bill_text_cache"
+
+DEFAULT_BILL_TYPES = ("hr", "s")
+LIST_PAGE_LIMIT = 250  # Largest page the bill list endpoint serves
 
 # Ensure output directory exists
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
 
-class CongressAPIClient:
-    """Client for interacting with Congress.gov API"""
+class HourlyRateLimiter:
+    """
+    Token bucket shared by every worker thread: holds up to requests_per_hour requests and refills
+    continuously at requests_per_hour per hour. back_off() pauses every worker after a 429, not just
+    the one that got it.
+    """
+
+    def __init__(self, requests_per_hour=REQUESTS_PER_HOUR):
+        self.capacity = float(requests_per_hour)
+        self.refill_rate = self.capacity / 3600.0
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+        self.resume_at = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a request may be sent."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.refill_rate)
+                self.last_refill = now
+
+                if now < self.resume_at:
+                    wait_time = self.resume_at - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                else:
+                    wait_time = (1 - self.tokens) / self.refill_rate
+
+            time.sleep(wait_time)
+
+    def back_off(self, seconds):
+        with self.lock:
+            self.resume_at = max(self.resume_at, time.monotonic() + seconds)
+
+
+class BillStore:
+    """
+    Append-only JSON Lines store of fetched bills, one {"bill_key": ..., **bill_record} per line. A
+    bill fetched again is appended again and its latest line wins, so saving a bill never rewrites
+    the bills before it.
+
+    Each append is a single write followed by fsync, so a crash can at most leave a torn last line,
+    which is dropped (and truncated away) the next time the store is opened. A malformed line anywhere
+    else is skipped, keeping the bills after it. compact() rewrites the
+    store with one line per bill and exports the consolidated {bill_key: bill_record} JSON.
+    """
+
+    def __init__(self, store_path=BILL_STORE_FILE, legacy_paths=(BILL_DATA_OUTPUT_FILE, BILL_DATA_FILE)):
+        """
+        :param legacy_paths: {bill_key: bill_record} JSON files imported when the store doesn't exist yet
+                             (later files take precedence).
+        """
+        self.store_path = Path(store_path)
+        self.lock = threading.Lock()
+        self.records = {}
+
+        if self.store_path.exists():
+            self._load()
+        else:
+            self._import_legacy(legacy_paths)
+
+    def _load(self):
+        """
+        Reads every complete line, skipping (and reporting) any that can't be decoded, and cuts off a torn
+        last line (one without its newline) so appends start on a clean line.
+        """
+        complete_size = 0
+        with open(self.store_path, "rb") as f:
+            for line_number, line in enumerate(f, start=1):
+                if not line.endswith(b"\n"):
+                    break  # Only the last line can lack its newline
+                complete_size += len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None
+                if not isinstance(record, dict) or "bill_key" not in record:
+                    print(f"Skipping malformed record on line {line_number} of {self.store_path}")
+                    continue
+                self.records[record.pop("bill_key")] = record
+
+        if complete_size < self.store_path.stat().st_size:
+            print(f"Dropping an incomplete record at the end of {self.store_path}")
+            with open(self.store_path, "r+b") as f:
+                f.truncate(complete_size)
 
-    def __init__(self, api_key: str, offset_limit=100, max_bills=100):
+    def _import_legacy(self, legacy_paths):
+        legacy_records = {}
+        for legacy_path in legacy_paths:
+            try:
+                with open(legacy_path, "r", encoding="utf-8") as f:
+                    legacy_records.update(json.load(f))
+            except FileNotFoundError:
+                continue
+
+        self._rewrite(legacy_records)
+        self.records = legacy_records
+        if legacy_records:
+            print(f"Imported {len(legacy_records)} bills into {self.store_path}")
+
+    def _rewrite(self, records):
+        """Writes a store holding exactly `records` to a temporary file and swaps it in."""
+        tmp_path = self.store_path.with_suffix(".jsonl.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for bill_key, record in records.items():
+                f.write(json.dumps({"bill_key": bill_key, **record}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.store_path)
+
+    def append(self, bill_key, record):
+        """Durably adds (or replaces) one bill."""
+        line = (json.dumps({"bill_key": bill_key, **record}) + "\n").encode("utf-8")
+        with self.lock:
+            with open(self.store_path, "ab") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self.records[bill_key] = record
+
+    def processed_bills(self):
+        """Keys of the bills in the store."""
+        with self.lock:
+            return set(self.records)
+
+    def compact(self, output_path=BILL_DATA_OUTPUT_FILE):
+        """Drops superseded lines from the store and writes the consolidated bills JSON BillTextAnalyzer reads."""
+        with self.lock:
+            self._rewrite(self.records)
+
+            tmp_path = Path(output_path).with_suffix(".json.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.records, f, indent=4)
+            os.replace(tmp_path, output_path)
+        print(f"Compacted {len(self.records)} bills into {output_path}")
+
+
+class BillTextCache:
+    """
+    On-disk cache of bill text documents, keyed by URL. For each URL it keeps the response's ETag and
+    Last-Modified (for conditional GETs), the raw HTML and the plain text extracted from it, both
+    gzip-compressed, so an unchanged document is neither downloaded nor parsed again.
+
+    Layout in cache_dir: index.sqlite (url → validators and file stem), and per document
+    <sha256(url)>.html.gz and <sha256(url)>.txt.gz.
+    """
+
+    def __init__(self, cache_dir=TEXT_CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.cache_dir / "index.sqlite"), check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents (url TEXT PRIMARY KEY, stem TEXT, etag TEXT, last_modified TEXT, fetched_at TEXT)"
+        )
+        self.conn.commit()
+        self.stats = {"downloaded": 0, "not_modified": 0, "cached_only": 0}
+
+    def count(self, outcome):
+        with self.lock:
+            self.stats[outcome] += 1
+
+    def validators(self, url):
+        """Conditional request headers for a cached URL ({} if it isn't cached)."""
+        with self.lock:
+            row = self.conn.execute("SELECT etag, last_modified FROM documents WHERE url = ?", (url,)).fetchone()
+        if not row:
+            return {}
+        headers = {}
+        if row[0]:
+            headers["If-None-Match"] = row[0]
+        if row[1]:
+            headers["If-Modified-Since"] = row[1]
+        return headers
+
+    def _stem(self, url):
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _write(self, path, data):
+        """Writes gzip-compressed bytes to a temporary file and swaps it in."""
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with gzip.open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def get_text(self, url):
+        """The cached plain text of a URL, or None if it isn't cached."""
+        with self.lock:
+            row = self.conn.execute("SELECT stem FROM documents WHERE url = ?", (url,)).fetchone()
+        if not row:
+            return None
+        try:
+            with gzip.open(self.cache_dir / f"{row[0]}.txt.gz", "rb") as f:
+                return f.read().decode("utf-8")
+        except FileNotFoundError:
+            return None
+
+    def put(self, url, response, text):
+        """Stores a downloaded document, its extracted text and its validators."""
+        stem = self._stem(url)
+        self._write(self.cache_dir / f"{stem}.html.gz", response.content)
+        self._write(self.cache_dir / f"{stem}.txt.gz", text.encode("utf-8"))
+
+        # The row only points at files that are fully written
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?)",
+                (url, stem, response.headers.get("ETag"), response.headers.get("Last-Modified"),
+                 datetime.now(timezone.utc).isoformat())
+            )
+            self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class CongressAPIClient:
+    """
+    Client for interacting with Congress.gov API. It holds a thread pool, an HTTP session and the text
+    cache's database, so close() it when done, or use it as a context manager.
+    """
+
+    def __init__(self, api_key: str, offset_limit=LIST_PAGE_LIMIT, max_bills=None, max_workers=8,
+                 requests_per_hour=REQUESTS_PER_HOUR, base_url=None, text_cache_dir=TEXT_CACHE_DIR,
+                 revalidate_text=True, bill_store_path=BILL_STORE_FILE):
+        """
+        :param offset_limit: Bills per list page.
+        :param max_bills: Max bills fetched per run (None for no cap). Listed bills beyond it stay in the
+                          listing checkpoint and are fetched by the next run.
+        :param max_workers: Bills fetched concurrently. Each bill's metadata, actions and text list are
+                            also fetched in parallel, so up to 3 * max_workers requests can be in flight.
+        :param requests_per_hour: Shared request budget across all workers (the API key's hourly quota).
+        :param base_url: API root, defaults to BASE_URL (CONGRESS_API_BASE_URL if set).
+        :param text_cache_dir: Folder of the bill text cache (None disables it).
+        :param revalidate_text: Check cached bill texts with a conditional GET. If False, cached texts
+                                are used without any request (e.g. when re-ingesting after a schema change).
+        :param bill_store_path: JSON Lines file fetched bills are appended to (see BillStore).
+        """
         self.api_key = api_key
-        self.base_url = BASE_URL
+        self.base_url = base_url or BASE_URL
         self.headers = {"X-API-Key": api_key}
 
         self.offset_limit = offset_limit  # User-defined API request limit
-        self.max_bills = max_bills  # User-defined max bills to fetch
+        self.max_bills = max_bills  # User-defined max bills to fetch per run
+        self.max_workers = max_workers
+
+        # One pooled session for every request, so connections (and TLS handshakes) are reused
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_workers * 4)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.rate_limiter = HourlyRateLimiter(requests_per_hour)
+        # Separate from the bill workers, so a bill waiting on its sub-requests can never starve them
+        self.subrequest_executor = ThreadPoolExecutor(max_workers=max_workers * 3, thread_name_prefix="congress-sub")
+
+        self.checkpoints = self.load_checkpoints()
+
+        self.text_cache = BillTextCache(text_cache_dir) if text_cache_dir else None
+        self.revalidate_text = revalidate_text
+
+        self.bill_store = BillStore(bill_store_path)
+
+    def close(self):
+        """Shuts down the sub-request pool and closes the HTTP session and the text cache."""
+        self.subrequest_executor.shutdown(wait=True)
+        self.session.close()
+        if self.text_cache:
+            self.text_cache.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def load_checkpoints(self):
+        """
+        Load the listing checkpoints, one per "{congress}_{bill_type}":
+            last_synced: toDateTime of the last sync whose bills were all fetched. The next sync lists
+                         only bills updated since then.
+            crawl: The sync in progress, if any: its fromDateTime/toDateTime window, the next list page
+                   to request (None once listing is done) and the bills listed so far.
+        """
+        try:
+            with open(CHECKPOINT_FILE, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
 
-        self.last_offset = self.load_last_offset()
-        self.new_offset = self.last_offset
+    def save_checkpoints(self):
+        """Write the listing checkpoints to a temporary file and swap it in, so a crash can't truncate them."""
+        tmp_path = CHECKPOINT_FILE.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.checkpoints, f, indent=4)
+        os.replace(tmp_path, CHECKPOINT_FILE)
 
-    def load_last_offset(self):
-        """Load the last used API offset from a file."""
-        try:
-            with open(OFFSET_FILE, "r", encoding="utf-8") as f:
-                return int(json.load(f).get("last_offset", 0))
-        except (FileNotFoundError, ValueError, TypeError):
-            return 0  # Default to 0 if no file or invalid data
-
-    def save_last_offset(self, offset):
-        """Save the last used API offset to a file."""
-        with open(OFFSET_FILE, "w", encoding="utf-8") as f:
-            json.dump({"last_offset": offset}, f, indent=4)
-
-    def _make_request(self, method: str, url: str, max_retries=10):
-        """Makes an API request with robust retry handling to prevent crashes."""
+    def _make_request(self, method: str, url: str, max_retries=10, headers=None):
+        """Makes an API request with robust retry handling to prevent crashes. Returns 304 responses as they are."""
         attempt = 0
         wait_time = 2  # Start with 2 seconds
 
         while attempt < max_retries:
             try:
-                response = requests.request(method, url, headers=self.headers, timeout=10)
+                self.rate_limiter.acquire()
+                response = self.session.request(method, url, headers=headers, timeout=10)
 
                 if response.status_code == 429:  # Handle API rate limit
                     retry_after = int(response.headers.get("Retry-After", wait_time))
                     print(f"Rate limit hit. Retrying in {retry_after} seconds...")
-                    time.sleep(retry_after)
+                    self.rate_limiter.back_off(retry_after)  # Every worker waits, not just this one
                     attempt += 1
                     continue
 
@@ -87,58 +378,75 @@ class CongressAPIClient:
         print(f"Skipping request permanently: {url} after {max_retries} failed attempts.")
         return None  # Fail gracefully, don't crash
 
-    def load_processed_bills(self):
-        """Load processed bill keys (their numbers) from a JSON file."""
-        try:
-            with open(PROCESSED_BILLS_FILE, "r", encoding="utf-8") as f:
-                return set(json.load(f).get("processed_bills", []))
-        except FileNotFoundError:
-            return set()
-
-    def load_existing_bill_data(self):
-        """Load existing bill full data from JSON to avoid overwriting."""
-        try:
-            with open(BILL_DATA_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return {}
-
-    def get_all_bills_from_congress(self, congress=118):
-        """Retrieve all HR and S bills from a specific Congress session."""
-        bills = []
-        endpoint = f"{self.base_url}/bill/{congress}"
+    def list_bills(self, congress: int, bill_type: str, full=False):
+        """
+        Lists the bills of one type in a Congress that were updated since its last completed sync (all of
+        them the first time, or with full=True), following pagination.next and checkpointing after every
+        page, so an interrupted listing resumes at the page it stopped on.
+
+        The window's toDateTime is fixed when the sync starts, so bills updated while it runs don't shift
+        the pages; they are picked up by the next sync.
+
+        Returns:
+            List[Tuple[str, str]]: (bill_number, update_date) pairs, oldest update first. None if listing
+            stopped on a failed request (the checkpoint keeps its place).
+        """
+        checkpoint_key = f"{congress}_{bill_type}"
+        checkpoint = self.checkpoints.setdefault(checkpoint_key, {})
+        crawl = checkpoint.get("crawl")
+
+        if crawl is None or (full and crawl["from_date_time"]):
+            from_date_time = None if full else checkpoint.get("last_synced")
+            to_date_time = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+            params = f"limit={self.offset_limit}&sort=updateDate+asc&toDateTime={to_date_time}"
+            if from_date_time:
+                params += f"&fromDateTime={from_date_time}"
+
+            crawl = {
+                "from_date_time": from_date_time,
+                "to_date_time": to_date_time,
+                "next_url": f"{self.base_url}/bill/{congress}/{bill_type}?{params}",
+                "bills": []
+            }
+            checkpoint["crawl"] = crawl
+            print(f"Listing {bill_type.upper()} bills of Congress {congress} updated {from_date_time or 'ever'} → {to_date_time}")
+        elif crawl["next_url"]:
+            print(f"Resuming {bill_type.upper()} listing of Congress {congress} after {len(crawl['bills'])} bills")
 
-        while len(bills) < self.max_bills:
-            response = self._make_request("GET", f"{endpoint}?offset={self.new_offset}&limit={self.offset_limit}")
+        while crawl["next_url"]:
+            response = self._make_request("GET", crawl["next_url"])
             if not response or response.status_code != 200:
-                break  
+                print(f"Listing {checkpoint_key} stopped, it will resume from the checkpoint.")
+                return None
 
             data = response.json()
-            new_bills = data.get("bills", [])
-            num_bills_fetched = len(new_bills)
-
-            print(f"Retrieved {num_bills_fetched} bills at offset {self.new_offset}")
-
-            if not new_bills:
-                break  
-
-            for bill in new_bills:
-                bill_type = bill.get("type", "").upper()
+            for bill in data.get("bills", []):
                 bill_number = bill.get("number")
+                if bill_number and bill.get("type", "").lower() == bill_type:
+                    crawl["bills"].append((bill_number, bill.get("updateDateIncludingText") or bill.get("updateDate")))
 
-                if bill_type in ["HR", "S"] and bill_number:
-                    bills.append((congress, bill_type.lower(), bill_number))
+            crawl["next_url"] = data.get("pagination", {}).get("next")
+            self.save_checkpoints()
 
-            self.new_offset += self.offset_limit
+        print(f"Listed {len(crawl['bills'])} {bill_type.upper()} bills from Congress {congress}.")
+        return [tuple(bill) for bill in crawl["bills"]]
 
-        print(f"FINAL TOTAL: Retrieved {len(bills)} HR and S bills from Congress {congress}.")
-        return bills, self.new_offset
+    def complete_sync(self, congress: int, bill_type: str):
+        """Marks the current sync of a bill type as done: the next one lists bills updated after its window."""
+        checkpoint = self.checkpoints[f"{congress}_{bill_type}"]
+        checkpoint["last_synced"] = checkpoint.pop("crawl")["to_date_time"]
+        self.save_checkpoints()
 
     def get_bill_details(self, congress: int, bill_type: str, bill_number: int):
-        """Fetch bill details, actions, and text versions efficiently."""
+        """Fetch bill details, actions, and text versions efficiently (the three requests run in parallel)."""
         base_url = f"{self.base_url}/bill/{congress}/{bill_type}/{bill_number}"
 
-        metadata_response = self._make_request("GET", base_url)
+        metadata_future, actions_future, text_future = [
+            self.subrequest_executor.submit(self._make_request, "GET", url)
+            for url in (base_url, f"{base_url}/actions", f"{base_url}/text")
+        ]
+
+        metadata_response = metadata_future.result()
 
         if not metadata_response or metadata_response.status_code != 200:
             return None
@@ -150,7 +458,7 @@ class CongressAPIClient:
 
         title = metadata.get("title", "N/A")
 
-        actions_response = self._make_request("GET", f"{base_url}/actions")
+        actions_response = actions_future.result()
         
         public_law_number = None
         became_law = False
@@ -163,7 +471,7 @@ class CongressAPIClient:
                     became_law = True
                     break  
 
-        text_response = self._make_request("GET", f"{base_url}/text")
+        text_response = text_future.result()
 
         bill_text_url = None
         if text_response and text_response.status_code == 200:
@@ -195,90 +503,174 @@ class CongressAPIClient:
         return text.strip()
 
     def extract_bill_raw_text(self, bill_text_url):
-        """Extracts plain text from the bill's HTML version."""
+        """
+        Extracts plain text from the bill's HTML version. With the text cache, a cached document is
+        revalidated with a conditional GET and its stored text is reused if unchanged (304).
+        """
         if not bill_text_url:
             return None
 
-        response = self._make_request("GET", bill_text_url)
+        cached_text = self.text_cache.get_text(bill_text_url) if self.text_cache else None
+        if cached_text is not None and not self.revalidate_text:
+            self.text_cache.count("cached_only")
+            return cached_text
+
+        conditional_headers = self.text_cache.validators(bill_text_url) if cached_text is not None else None
+        response = self._make_request("GET", bill_text_url, headers=conditional_headers)
         if not response:
-            return None
+            return cached_text  # Network gave up, fall back to the last known text
+
+        if response.status_code == 304 and cached_text is not None:
+            self.text_cache.count("not_modified")
+            return cached_text
 
         try:
             tree = html.fromstring(response.content)
-            return tree.text_content().strip()
+            text = tree.text_content().strip()
         except Exception as e:
             print(f"Error extracting text from {bill_text_url}: {e}")
             return None
 
-    def gather_bill_data(self):
-        """Fetch bill data efficiently, skipping already processed bills, and saving progress every 10 bills."""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        print(f"[{timestamp}]\n")
+        if self.text_cache:
+            self.text_cache.put(bill_text_url, response, text)
+            self.text_cache.count("downloaded")
+        return text
 
-        existing_bill_data = self.load_existing_bill_data()
-        processed_bills = self.load_processed_bills()
-        bills, last_offset_temp = self.get_all_bills_from_congress(118)
+    def fetch_bill(self, congress: int, bill_type: str, bill_number: int):
+        """Fetches one bill's details and cleaned raw text. Returns None if either is unavailable."""
+        bill_data = self.get_bill_details(congress, bill_type, bill_number)
 
-        structured_bill_data = existing_bill_data.copy()
-        processed_bills_temp = processed_bills.copy()
+        if not bill_data or not bill_data["bill_text_url"]:
+            return None
 
-        bills_processed_since_last_save = 0
+        #take the urls of the text and get the raw text
 
-        for congress, bill_type, bill_number in bills:
-            bill_key = f"{congress}_{bill_type}_{bill_number}"
+        bill_text_raw = self.extract_bill_raw_text(bill_data["bill_text_url"])
+        if not bill_text_raw:
+            return None
 
-            if bill_key in processed_bills:
-                print(f"Skipping {bill_key} (Already Processed)")
-                continue  
+        # Clean bill text
+        bill_text_raw = self.clean_bill_text(bill_text_raw)
 
-            print(f"Processing {bill_key}...")
-            bill_data = self.get_bill_details(congress, bill_type, bill_number)
+        return {
+            "congress": bill_data["congress"],
+            "bill_type": bill_data["bill_type"],
+            "bill_number": bill_data["bill_number"],
+            "title": bill_data["title"],
+            "became_law": bill_data["became_law"],
+            "public_law_number": bill_data["public_law_number"],
+            "bill_text_raw": bill_text_raw
+        }
 
-            if not bill_data or not bill_data["bill_text_url"]:
-                continue  
+    def gather_bill_data(self, congresses=(118,), bill_types=DEFAULT_BILL_TYPES, full=False, compact=True):
+        """
+        Fetch the bills updated since the last sync of each (congress, bill type), skipping bills whose
+        current version was already fetched. Up to max_workers bills are fetched at once; results are
+        collected on this thread and each one is appended to the bill store as soon as it arrives. A bill
+        type's sync is only marked complete once all of its listed bills have been attempted.
 
-            #take the urls of the text and get the raw text
+        :param full: Re-list every bill instead of only those updated since the last sync.
+        :param compact: Compact the bill store into bill_data_output.json afterwards.
+        """
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        print(f"[{timestamp}]\n")
 
-            bill_text_raw = self.extract_bill_raw_text(bill_data["bill_text_url"])
-            if not bill_text_raw:
-                continue
+        structured_bill_data = self.bill_store.records
+        processed_bills = self.bill_store.processed_bills()
+        attempted_bills = set()
 
-            # Clean bill text
-            bill_text_raw = self.clean_bill_text(bill_text_raw)
-
-            structured_bill_data[bill_key] = {
-                "congress": bill_data["congress"],
-                "bill_type": bill_data["bill_type"],
-                "bill_number": bill_data["bill_number"],
-                "title": bill_data["title"],
-                "became_law": bill_data["became_law"],
-                "public_law_number": bill_data["public_law_number"],
-                "bill_text_raw": bill_text_raw
-            }
+        pending_bills = []
+        listed_syncs = {}  # (congress, bill_type) → bill keys that must be attempted before the sync completes
+        for congress in congresses:
+            for bill_type in bill_types:
+                listed_bills = self.list_bills(congress, bill_type, full=full)
+                if listed_bills is None:
+                    continue
 
-            processed_bills_temp.add(bill_key)
-            bills_processed_since_last_save += 1
+                from_date_time = self.checkpoints[f"{congress}_{bill_type}"]["crawl"]["from_date_time"]
+                sync_keys = listed_syncs.setdefault((congress, bill_type), set())
+                for bill_number, update_date in listed_bills:
+                    bill_key = f"{congress}_{bill_type}_{bill_number}"
+                    existing_record = structured_bill_data.get(bill_key)
+
+                    # Up to date: fetched at this version, or (before update dates were recorded) at all,
+                    # unless this sync listed it as updated since the previous one
+                    if existing_record and existing_record.get("update_date"):
+                        up_to_date = existing_record["update_date"] >= (update_date or "")
+                    else:
+                        up_to_date = bill_key in processed_bills and not from_date_time
+                    if up_to_date:
+                        print(f"Skipping {bill_key} (Already Processed)")
+                        continue
+
+                    sync_keys.add(bill_key)
+                    pending_bills.append((bill_key, congress, bill_type, bill_number, update_date))
+
+        if self.max_bills is not None and len(pending_bills) > self.max_bills:
+            print(f"Fetching {self.max_bills} of {len(pending_bills)} listed bills, the rest wait for the next run.")
+            pending_bills = pending_bills[:self.max_bills]
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="congress-bill") as executor:
+            futures = {}
+            update_dates = {}
+            for bill_key, congress, bill_type, bill_number, update_date in pending_bills:
+                print(f"Processing {bill_key}...")
+                futures[executor.submit(self.fetch_bill, congress, bill_type, bill_number)] = bill_key
+                update_dates[bill_key] = update_date
+
+            for future in as_completed(futures):
+                bill_key = futures[future]
+                try:
+                    bill_record = future.result()
+                except Exception as e:
+                    print(f"Error processing {bill_key}: {e}")
+                    continue
 
-            # Save every 10 processed bills since been having a lot of timeouts, so progress is saved
-            # every 10 bills.
+                # Bills without text yet are relisted once text is published, as that changes their update date
+                attempted_bills.add(bill_key)
+                if not bill_record:
+                    continue
 
-            if bills_processed_since_last_save % 10 == 0:
-                self.save_bill_data_to_files(structured_bill_data, processed_bills_temp, last_offset_temp)
-                bills_processed_since_last_save = 0
+                bill_record["update_date"] = update_dates[bill_key]
+                self.bill_store.append(bill_key, bill_record)
 
-        return structured_bill_data, processed_bills_temp
+        if compact:
+            self.bill_store.compact()
 
-    def save_bill_data_to_files(self, structured_bill_data, processed_bills_temp, last_offset_temp):
-        """Saves bill data, processed bills, and offset to prevent data loss."""
-        with open(BILL_DATA_FILE, "w", encoding="utf-8") as f:
-            json.dump(structured_bill_data, f, indent=4)
+        if self.text_cache:
+            print(f"Bill text cache: {self.text_cache.stats}")
 
-        with open(PROCESSED_BILLS_FILE, "w", encoding="utf-8") as f:
-            json.dump({"processed_bills": list(processed_bills_temp)}, f, indent=4)
+        # Bills that raised (or didn't fit under max_bills) keep their sync open, to be retried next run
+        for (congress, bill_type), sync_keys in listed_syncs.items():
+            if sync_keys <= attempted_bills:
+                self.complete_sync(congress, bill_type)
 
-        self.save_last_offset(last_offset_temp)
+        return structured_bill_data, self.bill_store.processed_bills()
 
 
 # Run the Script
-client = CongressAPIClient(API_KEY, offset_limit=10, max_bills=100)
-client.gather_bill_data()
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fetch bills updated since the last sync from the Congress.gov API.")
+    parser.add_argument("--congress", type=int, nargs="+", default=[118], help="Congresses to sync.")
+    parser.add_argument("--bill-types", nargs="+", default=list(DEFAULT_BILL_TYPES), help="Bill types to sync, e.g. hr s hjres.")
+    parser.add_argument("--full", action="store_true", help="Re-list every bill instead of only those updated since the last sync.")
+    parser.add_argument("--workers", type=int, default=8, help="Bills fetched concurrently.")
+    parser.add_argument("--max-bills", type=int, default=None, help="Max bills to fetch per run (default: no cap).")
+    parser.add_argument("--offset-limit", type=int, default=LIST_PAGE_LIMIT, help="Bills per list page.")
+    parser.add_argument("--requests-per-hour", type=int, default=REQUESTS_PER_HOUR, help="Shared API request budget.")
+    parser.add_argument("--no-text-cache", action="store_true", help="Download bill texts without the local text cache.")
+    parser.add_argument("--no-revalidate-text", action="store_true", help="Use cached bill texts without checking them for changes.")
+    parser.add_argument("--no-compact", action="store_true", help="Skip writing bill_data_output.json after fetching.")
+    parser.add_argument("--compact-only", action="store_true", help="Only compact the bill store into bill_data_output.json.")
+    args = parser.parse_args()
+
+    if args.compact_only:
+        BillStore().compact()
+        raise SystemExit
+
+    with CongressAPIClient(API_KEY, offset_limit=args.offset_limit, max_bills=args.max_bills,
+                           max_workers=args.workers, requests_per_hour=args.requests_per_hour,
+                           text_cache_dir=None if args.no_text_cache else TEXT_CACHE_DIR,
+                           revalidate_text=not args.no_revalidate_text) as client:
+        client.gather_bill_data(args.congress, [bill_type.lower() for bill_type in args.bill_types], full=args.full,
+                                compact=not args.no_compact)
@@ -0,0 +1,211 @@
+"""
+Local stand-in for the parts of the Congress.gov API that congress_bill_processor uses, so ingestion
+can be run and tested offline.
+
+Serves a generated set of HR and S bills: the bill lists (offset/limit, fromDateTime/toDateTime filters
+on updateDateIncludingText, pagination.next links), bill metadata, actions, text versions and an HTML
+text page per bill (with ETag/Last-Modified, answering conditional GETs with 304). Every 7th bill became public law. It can add latency to every
+response and answer some requests with 429 + Retry-After to exercise rate-limit handling.
+
+Run it, then point the processor at it:
+    python data_processing/mock_congress_server.py --port 8765
+    CONGRESS_API_BASE_URL=http://127.0.0.1:8765/v3 CONGRESS_OUTPUT_DIR=/tmp/congress_mock \
+        python data_processing/congress_bill_processor.py
+
+Or from Python (e.g. in a test), as a context manager:
+    with run_mock_server(num_bills=50) as base_url:
+        client = CongressAPIClient("test-key", base_url=base_url)
+"""
+
+import argparse
+import hashlib
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+
+def generate_bills(num_bills=200, congress=118):
+    """Alternating HR and S bills, numbered from 1, last updated on consecutive days of 2024."""
+    return [
+        {
+            "congress": congress,
+            "type": "HR" if i % 2 == 0 else "S",
+            "number": str(i + 1),
+            "updateDateIncludingText": (datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(days=i)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        }
+        for i in range(num_bills)
+    ]
+
+
+def list_page(bills, url, query, host):
+    """One page of a bill list response, filtered by fromDateTime/toDateTime, with a pagination.next link."""
+    offset = int(query.get("offset", ["0"])[0])
+    limit = int(query.get("limit", ["20"])[0])
+    from_date_time = query.get("fromDateTime", [None])[0]
+    to_date_time = query.get("toDateTime", [None])[0]
+
+    bills = [
+        bill for bill in bills
+        if (not from_date_time or bill["updateDateIncludingText"] >= from_date_time)
+        and (not to_date_time or bill["updateDateIncludingText"] <= to_date_time)
+    ]
+    bills.sort(key=lambda bill: bill["updateDateIncludingText"])
+
+    pagination = {"count": len(bills)}
+    if offset + limit < len(bills):
+        next_query = {key: values[0] for key, values in query.items()}
+        next_query["offset"] = str(offset + limit)
+        pagination["next"] = f"http://{host}{url.path}?{urlencode(next_query)}"
+
+    return {"bills": bills[offset:offset + limit], "pagination": pagination}
+
+
+class MockCongressHandler(BaseHTTPRequestHandler):
+    server_version = "MockCongress/1.0"
+
+    def log_message(self, format, *args):
+        pass  # Keep test output quiet
+
+    def send_json(self, payload, status=200, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        state = self.server.state
+        with state["lock"]:
+            state["requests"] += 1
+            request_number = state["requests"]
+            state["paths"].append(self.path)
+
+        if state["latency"]:
+            time.sleep(state["latency"])
+
+        if state["rate_limit_every"] and request_number % state["rate_limit_every"] == 0:
+            self.send_json({"error": "rate limited"}, status=429, headers={"Retry-After": "1"})
+            return
+
+        if self.headers.get("X-API-Key") is None and not self.path.startswith("/text/"):
+            self.send_json({"error": "missing api key"}, status=403)
+            return
+
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        parts = [part for part in url.path.split("/") if part]
+        bills = {(str(bill["congress"]), bill["type"].lower(), bill["number"]): bill for bill in state["bills"]}
+
+        # /v3/bill/{congress} and /v3/bill/{congress}/{type}
+        if parts[:2] == ["v3", "bill"] and len(parts) in (3, 4):
+            listed_bills = [
+                bill for bill in state["bills"]
+                if str(bill["congress"]) == parts[2] and (len(parts) == 3 or bill["type"].lower() == parts[3].lower())
+            ]
+            self.send_json(list_page(listed_bills, url, query, self.headers.get("Host")))
+            return
+
+        # /v3/bill/{congress}/{type}/{number}[/actions|/text]
+        if parts[:2] == ["v3", "bill"] and len(parts) in (5, 6):
+            key = (parts[2], parts[3].lower(), parts[4])
+            bill = bills.get(key)
+            if bill is None:
+                self.send_json({"error": "not found"}, status=404)
+                return
+
+            number = int(bill["number"])
+            sub_resource = parts[5] if len(parts) == 6 else None
+
+            if sub_resource is None:
+                self.send_json({"bill": {**bill, "title": f"Mock {bill['type']} {number} Act"}})
+            elif sub_resource == "actions":
+                actions = [{"type": "IntroReferral", "text": "Referred to committee."}]
+                if number % 7 == 0:
+                    actions.insert(0, {"type": "BecameLaw", "text": f"Became Public Law No: {bill['congress']}-{number}."})
+                self.send_json({"actions": actions})
+            elif sub_resource == "text":
+                host = self.headers.get("Host")
+                text_url = f"http://{host}/text/{key[0]}/{key[1]}/{key[2]}.htm"
+                self.send_json({"textVersions": [{"formats": [{"type": "Formatted Text", "url": text_url}]}]})
+            else:
+                self.send_json({"error": "not found"}, status=404)
+            return
+
+        # /text/{congress}/{type}/{number}.htm
+        if parts[:1] == ["text"] and len(parts) == 4:
+            body = (
+                f"<html><body><pre>{parts[2].upper()} {parts[3][:-4]}\n\nBe it enacted by the Senate and House of "
+                f"Representatives,\n\n  SECTION 1. Section 8 of title 42, United States Code, is amended.</pre></body></html>"
+            ).encode("utf-8")
+            etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", "Mon, 01 Jan 2024 00:00:00 GMT")
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        self.send_json({"error": "not found"}, status=404)
+
+
+def create_mock_server(host="127.0.0.1", port=0, num_bills=200, latency=0.0, rate_limit_every=0):
+    """
+    Creates (but doesn't start) a mock server. port=0 picks a free port.
+
+    :param latency: Seconds added to every response, to make concurrency visible.
+    :param rate_limit_every: Answer every Nth request with 429 and Retry-After: 1 (0 disables).
+    """
+    server = ThreadingHTTPServer((host, port), MockCongressHandler)
+    server.daemon_threads = True
+    server.state = {
+        "bills": generate_bills(num_bills),
+        "latency": latency,
+        "rate_limit_every": rate_limit_every,
+        "requests": 0,
+        "paths": [],
+        "lock": threading.Lock()
+    }
+    return server
+
+
+@contextmanager
+def run_mock_server(**kwargs):
+    """Runs a mock server on a background thread and yields its API base URL (http://127.0.0.1:<port>/v3)."""
+    server = create_mock_server(**kwargs)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        host, port = server.server_address
+        yield f"http://{host}:{port}/v3"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local mock of the Congress.gov API.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--bills", type=int, default=200, help="Number of bills to serve.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response.")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="Answer every Nth request with 429.")
+    args = parser.parse_args()
+
+    mock_server = create_mock_server(port=args.port, num_bills=args.bills, latency=args.latency,
+                                     rate_limit_every=args.rate_limit_every)
+    print(f"Mock Congress.gov API running at http://127.0.0.1:{args.port}/v3")
+    mock_server.serve_forever()
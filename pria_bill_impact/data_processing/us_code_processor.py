@@ -1,10 +1,14 @@
 import xml.etree.ElementTree as ET
 import json
+import os
 import re
+import shutil
 import unicodedata
 import io
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 
 
 # Google Drive Folder ID where the processed JSON will be uploaded
@@ -12,6 +16,20 @@ from typing import Dict, List, Optional
 
 LOCAL_XML_DIR = Path(__file__).resolve().parent / "data" / "code_xml"
 
+# Text normalization used by USCodeParser.clean_text, compiled once
+QUOTE_AND_DASH_REPLACEMENTS = (
+    ("\u2014", "-"), ("\u2013", "-"), ("\u201c", '"'), ("\u201d", '"'),
+    ("\u2018", "'"), ("\u2019", "'"),
+)
+DELETED_CHARS_TABLE = str.maketrans("", "", "-.")
+# Same matches as r'"?SECTION\s+|"?SEC\s+' with re.IGNORECASE (the classes list every character IGNORECASE
+# folds to each letter), but much faster to scan for
+SECTION_PREFIX_RE = re.compile('(?=["Ss\u017f])"?[Ss\u017f][Ee][Cc](?:[Tt][Ii\u0130\u0131][Oo][Nn])?\\s+')
+
+# Joins the fragments of a section so they're cleaned in one pass. XML text can't contain NUL, it's neither
+# whitespace nor matched by SECTION_PREFIX_RE, and NFKD never reorders characters across it.
+FRAGMENT_SEPARATOR = "\x00"
+
 
 class USCodeParser:
     """
@@ -25,59 +43,126 @@ class USCodeParser:
         """Clean and normalize text content."""
         if not text:
             return ""
-        text = unicodedata.normalize("NFKD", text)
-
-        replacements = {
-            "\u2014": "-", "\u2013": "-", "\u201c": '"', "\u201d": '"',
-            "\u2018": "'", "\u2019": "'",
-        }
-        for key, value in replacements.items():
-            text = text.replace(key, value)
-
-        text = re.sub(r'\s+', ' ', text.strip())
-        text = re.sub(r'[-.]', '', text)
-        text = re.sub(r'"?SECTION\s+|"?SEC\s+', '', text, flags=re.IGNORECASE)
+        text = self.replace_quotes_and_dashes(unicodedata.normalize("NFKD", text))
+        text = ' '.join(text.split())  # Collapse whitespace runs and strip
+        return SECTION_PREFIX_RE.sub('', text.translate(DELETED_CHARS_TABLE))
+
+    def clean_fragments(self, fragments: List[str]) -> str:
+        """
+        Same result as ' '.join(filter(None, map(clean_text, fragments))), in one pass over the joined text.
+
+        Whitespace next to a separator is dropped right after collapsing, which strips every fragment at
+        once, so the remaining steps behave exactly as they do on each fragment alone.
+        """
+        text = self.replace_quotes_and_dashes(unicodedata.normalize("NFKD", FRAGMENT_SEPARATOR.join(fragments)))
+        text = ' '.join(text.split())
+        text = text.replace(" " + FRAGMENT_SEPARATOR, FRAGMENT_SEPARATOR).replace(FRAGMENT_SEPARATOR + " ", FRAGMENT_SEPARATOR)
+        text = SECTION_PREFIX_RE.sub('', text.translate(DELETED_CHARS_TABLE))
+        return ' '.join(filter(None, text.split(FRAGMENT_SEPARATOR)))
+
+    @staticmethod
+    def replace_quotes_and_dashes(text: str) -> str:
+        # A few str.replace calls are much faster than str.translate with a str-valued table on non-ASCII text
+        for old, new in QUOTE_AND_DASH_REPLACEMENTS:
+            if old in text:
+                text = text.replace(old, new)
         return text
 
     def parse_xml_from_file(self, xml_file: Path) -> Dict[str, Dict]:
         """Parses an XML file and returns a list of extracted sections."""
         sections_data = {}
         try:
-            print(f"📖 Processing: {xml_file.name}")
-            tree = ET.parse(xml_file)
-            root = tree.getroot()
-
-            title_elem = root.find('.//default:title', self.ns)
-            if title_elem is None:
-                print(f"Warning: No title element found in {xml_file.name}")
-                return sections_data
-
-            title_info = {
-                'title_number': self.safe_extract_text(title_elem, 'default:num').replace('Title', '').strip(),
-                'title_name': self.safe_extract_text(title_elem, 'default:heading')
-            }
-
-            for chapter in root.findall('.//default:chapter', self.ns):
-                chapter_info = {
-                    **title_info,
-                    'chapter_number': self.safe_extract_text(chapter, 'default:num').replace('CHAPTER', '').strip(),
-                    'chapter_name': self.safe_extract_text(chapter, 'default:heading')
-                }
-
-                for section in chapter.findall('.//default:section', self.ns):
-                    try:
-                        section_data = self.parse_section(section, chapter_info)
-                        if section_data['content']:
-	                        section_key = section_data['section_identifier_full']  # Use section_identifier_full as key
-	                        sections_data[section_key] = section_data
-                    except Exception as e:
-                        print(f"Warning: Error parsing section in {xml_file.name}: {str(e)}")
-
+            for section_key, section_data in self.iter_sections(xml_file):
+                sections_data[section_key] = section_data
         except Exception as e:
             print(f"Error processing {xml_file.name}: {str(e)}")
 
         return sections_data
 
+    def iter_sections(self, xml_file: Path) -> Iterator[Tuple[str, Dict]]:
+        """
+        Streams (section_identifier_full, section_data) for every section under a chapter of the title file.
+
+        The file is read with iterparse instead of loading the whole tree. Each top-level section is
+        parsed as soon as it has been read, then removed from the tree along with everything else that
+        isn't needed anymore, so memory stays bounded by the largest section rather than the title.
+        Sections nested inside a section (e.g. quoted in its notes) are yielded right after it, in the
+        same order findall would list them.
+        """
+        print(f"📖 Processing: {xml_file.name}")
+        tag = lambda name: f"{{{self.ns['default']}}}{name}"
+        section_tag, chapter_tag, title_tag = tag('section'), tag('chapter'), tag('title')
+        num_tag, heading_tag = tag('num'), tag('heading')
+
+        stack = []  # Open elements, outermost first
+        title_elem = None
+        title_info = {'title_number': '', 'title_name': ''}
+        title_fields_seen = set()
+        section_depth = 0  # Open section elements; everything inside a section is kept until the outermost one ends
+
+        for event, elem in ET.iterparse(str(xml_file), events=("start", "end")):
+            if event == "start":
+                stack.append(elem)
+                if elem.tag == title_tag and title_elem is None:
+                    title_elem = elem
+                elif elem.tag == section_tag:
+                    section_depth += 1
+                continue
+
+            stack.pop()
+            parent = stack[-1] if stack else None
+
+            if elem.tag == section_tag:
+                section_depth -= 1
+            if section_depth:
+                continue
+
+            if elem.tag == section_tag:
+                if title_elem is not None:
+                    chapter = next((ancestor for ancestor in reversed(stack) if ancestor.tag == chapter_tag), None)
+                    for section, section_chapter in self._walk_sections(elem, chapter):
+                        try:
+                            section_data = self.parse_section(section, self._chapter_info(section_chapter, title_info))
+                            if section_data['content']:
+                                yield section_data['section_identifier_full'], section_data  # Use section_identifier_full as key
+                        except Exception as e:
+                            print(f"Warning: Error parsing section in {xml_file.name}: {str(e)}")
+
+            elif parent is not None and parent is title_elem and elem.tag in (num_tag, heading_tag):
+                # Only the title's first num/heading count, like element.find
+                if elem.tag not in title_fields_seen:
+                    title_fields_seen.add(elem.tag)
+                    if elem.tag == num_tag:
+                        title_info['title_number'] = self.clean_text(elem.text).replace('Title', '').strip()
+                    else:
+                        title_info['title_name'] = self.clean_text(elem.text)
+
+            if parent is not None and elem.tag in (num_tag, heading_tag) and parent.tag == chapter_tag:
+                continue  # A chapter's num/heading are read whenever one of its sections is parsed
+
+            if parent is not None:
+                parent.remove(elem)
+
+        if title_elem is None:
+            print(f"Warning: No title element found in {xml_file.name}")
+
+    def _walk_sections(self, elem: ET.Element, chapter: Optional[ET.Element]) -> Iterator[Tuple[ET.Element, ET.Element]]:
+        """Yields (section, innermost enclosing chapter) for elem and its descendants in document order, skipping sections outside any chapter."""
+        if elem.tag == f"{{{self.ns['default']}}}chapter":
+            chapter = elem
+        elif elem.tag == f"{{{self.ns['default']}}}section" and chapter is not None:
+            yield elem, chapter
+
+        for child in elem:
+            yield from self._walk_sections(child, chapter)
+
+    def _chapter_info(self, chapter: ET.Element, title_info: Dict) -> Dict:
+        return {
+            **title_info,
+            'chapter_number': self.safe_extract_text(chapter, 'default:num').replace('CHAPTER', '').strip(),
+            'chapter_name': self.safe_extract_text(chapter, 'default:heading')
+        }
+
 
     def safe_extract_text(self, element: Optional[ET.Element], xpath: str) -> str:
         """Safely extract text from an element."""
@@ -93,13 +178,13 @@ class USCodeParser:
             for content in section.findall('.//default:content', self.ns):
                 for elem in content.iter():
                     if elem.text:
-                        text_parts.append(self.clean_text(elem.text))
+                        text_parts.append(elem.text)
                     if elem.tail:
-                        text_parts.append(self.clean_text(elem.tail))
+                        text_parts.append(elem.tail)
         except Exception as e:
             print(f"Warning: Error extracting content from section: {str(e)}")
 
-        return ' '.join(filter(None, text_parts))
+        return self.clean_fragments(text_parts)
 
     def parse_section(self, section: ET.Element, context_info: Dict) -> Dict:
         """Parse section metadata and content."""
@@ -123,11 +208,68 @@ class USCodeParser:
         }
 
 
-def process_all_xml_files(local_xml_dir):
-    """Processes all XML files in a local directory and saves the results to a local folder."""
+def parse_title_file_to_jsonl(xml_file: Path, part_path: Path) -> int:
+    """
+    Streams one title file's sections to a JSON Lines part file and returns how many were written.
+    Runs in a worker process. If the file can't be parsed, its part file is removed and it contributes nothing.
+    """
     parser = USCodeParser()
-    all_sections = {}
+    count = 0
+    try:
+        with open(part_path, "w", encoding="utf-8") as f:
+            for _, section_data in parser.iter_sections(xml_file):
+                f.write(json.dumps(section_data) + "\n")
+                count += 1
+    except Exception as e:
+        print(f"Error processing {xml_file.name}: {str(e)}")
+        part_path.unlink(missing_ok=True)
+        return 0
+
+    return count
 
+
+def export_sections_jsonl_to_json(jsonl_file: Path, json_file: Path) -> int:
+    """
+    Writes the legacy processed_uscode_sections.json ({section_identifier_full: section_data}) from the
+    JSON Lines output without loading every section at once. A key that appears more than once keeps its
+    first position and its last value, like repeated dict updates. Returns the number of sections written.
+    """
+    # First pass: byte offset of the last line for each key, in order of first appearance
+    offsets = {}
+    with open(jsonl_file, "rb") as f:
+        offset = f.tell()
+        for line in iter(f.readline, b""):
+            if line.strip():
+                offsets[json.loads(line)['section_identifier_full']] = offset
+            offset = f.tell()
+
+    # Second pass: write the entries the way json.dump(all_sections, f, indent=2) would
+    with open(jsonl_file, "rb") as source, open(json_file, "w", encoding="utf-8") as f:
+        if not offsets:
+            f.write("{}")
+            return 0
+
+        f.write("{\n")
+        for i, (section_key, offset) in enumerate(offsets.items()):
+            source.seek(offset)
+            section_data = json.loads(source.readline())
+            entry = json.dumps(section_data, indent=2).replace("\n", "\n  ")
+            if i:
+                f.write(",\n")
+            f.write(f"  {json.dumps(section_key)}: {entry}")
+        f.write("\n}")
+
+    return len(offsets)
+
+
+def process_all_xml_files(local_xml_dir, workers=None, legacy_json=True):
+    """
+    Processes all XML files in a local directory and saves the results to a local folder.
+
+    Title files are parsed in parallel on `workers` processes (default: one per CPU), each streaming its
+    sections to a part file. The parts are appended, in file order, to data_output/processed_uscode_sections.jsonl
+    (one section per line). With legacy_json, the usual processed_uscode_sections.json is exported from it too.
+    """
     # Ensure the local XML directory exists
     if not local_xml_dir.exists():
         print(f"Error: XML directory '{local_xml_dir}' does not exist!")
@@ -136,28 +278,47 @@ def process_all_xml_files(local_xml_dir):
     xml_files = list(local_xml_dir.glob("*.xml"))
     print(f"📂 Found {len(xml_files)} XML files in 'data/' folder.")
 
-    for xml_file in xml_files:
-    	sections = parser.parse_xml_from_file(xml_file)
-    	all_sections.update(sections)
-
     # Ensure the output directory exists
     output_dir = Path(__file__).parent / "data_output"
-    output_dir.mkdir(parents=True, exist_ok=True)
-
-    # Define output file path
-    output_file = output_dir / "processed_uscode_sections.json"
-
-    # Save to JSON
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(all_sections, f, indent=2)
-
-    print(f"\nProcessing complete. Extracted {len(all_sections)} sections.")
+    parts_dir = output_dir / "processed_uscode_sections.parts"
+    parts_dir.mkdir(parents=True, exist_ok=True)
+
+    # Define output file paths
+    output_file = output_dir / "processed_uscode_sections.jsonl"
+    json_output_file = output_dir / "processed_uscode_sections.json"
+
+    part_paths = [parts_dir / f"{i:04d}_{xml_file.stem}.jsonl" for i, xml_file in enumerate(xml_files)]
+    workers = workers or os.cpu_count() or 1
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            counts = list(executor.map(parse_title_file_to_jsonl, xml_files, part_paths))
+    else:
+        counts = [parse_title_file_to_jsonl(xml_file, part_path) for xml_file, part_path in zip(xml_files, part_paths)]
+
+    with open(output_file, "wb") as f:
+        for part_path in part_paths:
+            if part_path.exists():
+                with open(part_path, "rb") as part:
+                    shutil.copyfileobj(part, f)
+                part_path.unlink()
+    shutil.rmtree(parts_dir, ignore_errors=True)
+
+    print(f"\nProcessing complete. Extracted {sum(counts)} sections.")
     print(f"📂 Results saved to {output_file}")
 
+    if legacy_json:
+        section_count = export_sections_jsonl_to_json(output_file, json_output_file)
+        print(f"📂 {section_count} unique sections exported to {json_output_file}")
+
 
 
 # Run the processor
 if __name__ == "__main__":
-    process_all_xml_files(LOCAL_XML_DIR)
-
+    arg_parser = argparse.ArgumentParser(description="Parse U.S. Code title XML files into processed sections.")
+    arg_parser.add_argument("--workers", type=int, default=None, help="Parallel worker processes (default: one per CPU).")
+    arg_parser.add_argument("--no-legacy-json", action="store_true",
+                            help="Only write processed_uscode_sections.jsonl, not the combined JSON file.")
+    args = arg_parser.parse_args()
 
+    process_all_xml_files(LOCAL_XML_DIR, workers=args.workers, legacy_json=not args.no_legacy_json)
@@ -0,0 +1,122 @@
+"""
+Microbenchmark of USCodeParser's fused text normalization against the previous per-fragment clean_text,
+on a full title XML file. Also checks that both produce byte-identical sections.
+
+Run from the pria_bill_impact folder:
+    python -m evaluation.benchmark_clean_text data_processing/data/code_xml/usc42.xml
+"""
+
+import argparse
+import json
+import re
+import time
+import unicodedata
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from data_processing.us_code_processor import USCodeParser
+
+
+# File Paths
+OUTPUT_PATH = Path(__file__).parent / "data_output/clean_text_benchmark.json"
+
+
+class LegacyUSCodeParser(USCodeParser):
+    """USCodeParser with the original clean_text: normalize, six replaces and three uncompiled re.subs per fragment."""
+
+    def clean_text(self, text):
+        if not text:
+            return ""
+        text = unicodedata.normalize("NFKD", text)
+
+        replacements = {
+            "\u2014": "-", "\u2013": "-", "\u201c": '"', "\u201d": '"',
+            "\u2018": "'", "\u2019": "'",
+        }
+        for key, value in replacements.items():
+            text = text.replace(key, value)
+
+        text = re.sub(r'\s+', ' ', text.strip())
+        text = re.sub(r'[-.]', '', text)
+        text = re.sub(r'"?SECTION\s+|"?SEC\s+', '', text, flags=re.IGNORECASE)
+        return text
+
+    def clean_fragments(self, fragments):
+        return ' '.join(filter(None, [self.clean_text(fragment) for fragment in fragments]))
+
+
+def collect_section_fragments(xml_file, ns):
+    """Raw text/tail fragments of every section's content elements, one list per section."""
+    sections = []
+    for section in ET.parse(xml_file).getroot().iter(f"{{{ns['default']}}}section"):
+        fragments = []
+        for content in section.findall('.//default:content', ns):
+            for elem in content.iter():
+                fragments.extend(text for text in (elem.text, elem.tail) if text)
+        sections.append(fragments)
+    return sections
+
+
+def best_time(function, repeats):
+    """Best wall time of `repeats` runs, in seconds."""
+    timings = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start_time)
+    return min(timings)
+
+
+def run_benchmark(xml_file, repeats=3):
+    xml_file = Path(xml_file)
+    legacy_parser, parser = LegacyUSCodeParser(), USCodeParser()
+
+    sections = collect_section_fragments(xml_file, parser.ns)
+    fragment_count = sum(len(fragments) for fragments in sections)
+    print(f"📂 {xml_file.name}: {len(sections)} sections, {fragment_count} text fragments")
+
+    legacy_texts = [legacy_parser.clean_fragments(fragments) for fragments in sections]
+    fused_texts = [parser.clean_fragments(fragments) for fragments in sections]
+    mismatches = sum(legacy != fused for legacy, fused in zip(legacy_texts, fused_texts))
+
+    legacy_seconds = best_time(lambda: [legacy_parser.clean_fragments(fragments) for fragments in sections], repeats)
+    fused_seconds = best_time(lambda: [parser.clean_fragments(fragments) for fragments in sections], repeats)
+
+    # End to end, including the streaming XML parse
+    legacy_sections = list(legacy_parser.iter_sections(xml_file))
+    parsed_sections = list(parser.iter_sections(xml_file))
+    identical = json.dumps(legacy_sections) == json.dumps(parsed_sections)
+    legacy_parse_seconds = best_time(lambda: list(legacy_parser.iter_sections(xml_file)), 1)
+    parse_seconds = best_time(lambda: list(parser.iter_sections(xml_file)), 1)
+
+    results = {
+        "xml_file": xml_file.name,
+        "sections": len(sections),
+        "fragments": fragment_count,
+        "clean_text": {"legacy_seconds": legacy_seconds, "fused_seconds": fused_seconds, "speedup": legacy_seconds / fused_seconds},
+        "parse_file": {"legacy_seconds": legacy_parse_seconds, "fused_seconds": parse_seconds, "speedup": legacy_parse_seconds / parse_seconds},
+        "mismatched_sections": mismatches,
+        "parsed_output_identical": identical
+    }
+
+    print(f"\n{'':<12} {'legacy (s)':>12} {'fused (s)':>12} {'speedup':>8}")
+    for name in ("clean_text", "parse_file"):
+        timing = results[name]
+        print(f"{name:<12} {timing['legacy_seconds']:>12.3f} {timing['fused_seconds']:>12.3f} {timing['speedup']:>7.1f}x")
+    print(f"\nMismatched sections: {mismatches}. Parsed output identical: {identical}")
+
+    OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=4)
+    print(f"Benchmark results saved to {OUTPUT_PATH}")
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark fused clean_text against the per-fragment version.")
+    parser.add_argument("xml_file", help="U.S. Code title XML file, e.g. data_processing/data/code_xml/usc42.xml")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per variant (the best is reported).")
+    args = parser.parse_args()
+
+    run_benchmark(args.xml_file, args.repeats)
@@ -0,0 +1,110 @@
+"""
+Recall-vs-latency benchmark of the approximate FAISS index types against the exact (flat) baseline,
+used to pick an index type and nprobe/efSearch for the full U.S. Code index.
+
+Run from the pria_bill_impact folder, after building the flat U.S. Code index:
+    python -m evaluation.benchmark_faiss_index --queries 500 --top-k 10
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+from models.embedder_and_faiss_indexer import build_faiss_index, normalize_embeddings, set_search_params
+
+
+# File Paths
+FLAT_INDEX_PATH = Path(__file__).parent.parent / "faiss_indexes/faiss_us_code.index"
+OUTPUT_PATH = Path(__file__).parent / "data_output/faiss_index_benchmark.json"
+
+# (index type, build params, search params to sweep)
+CONFIGS = [
+    ("ivf_flat", {}, [{"nprobe": n} for n in (1, 4, 16, 64)]),
+    ("ivf_pq", {"pq_m": 48}, [{"nprobe": n} for n in (1, 4, 16, 64)]),
+    ("hnsw", {"hnsw_m": 32}, [{"ef_search": ef} for ef in (16, 32, 64, 128)]),
+]
+
+
+def recall_at_k(approx_indices, exact_indices):
+    """Average fraction of the exact top-k neighbors that the approximate search also returned."""
+    hits = [len(set(a) & set(e)) / len(e) for a, e in zip(approx_indices, exact_indices)]
+    return float(np.mean(hits))
+
+
+def time_queries(index, queries, top_k):
+    """Searches one query at a time (like the analyzer does) and returns (indices, avg ms per query)."""
+    all_indices = []
+    start_time = time.perf_counter()
+    for query in queries:
+        _, indices = index.search(query.reshape(1, -1), top_k)
+        all_indices.append(indices[0])
+    elapsed_ms = (time.perf_counter() - start_time) * 1000
+    return np.array(all_indices), elapsed_ms / len(queries)
+
+
+def run_benchmark(num_queries=500, top_k=10, noise=0.05, seed=42):
+    flat_index = faiss.read_index(str(FLAT_INDEX_PATH))
+    if isinstance(flat_index, faiss.IndexIDMap2):
+        # Updatable indexes wrap the flat index in an id map; benchmark the vectors it holds directly
+        flat_index = faiss.downcast_index(flat_index.index)
+    if not isinstance(flat_index, faiss.IndexFlat):
+        raise ValueError(f"{FLAT_INDEX_PATH} is not a flat index, can't use it as the exact baseline.")
+
+    vectors = flat_index.reconstruct_n(0, flat_index.ntotal)
+    metric = "cosine" if flat_index.metric_type == faiss.METRIC_INNER_PRODUCT else "l2"
+    print(f"📂 Loaded {flat_index.ntotal} {metric} vectors of dimension {flat_index.d} from {FLAT_INDEX_PATH}")
+
+    # Queries are perturbed copies of indexed vectors, so the exact top-k isn't trivially the vector itself
+    rng = np.random.default_rng(seed)
+    queries = vectors[rng.choice(len(vectors), min(num_queries, len(vectors)), replace=False)]
+    queries = (queries + rng.normal(0, noise * vectors.std(), queries.shape)).astype("float32")
+    if metric == "cosine":
+        queries = normalize_embeddings(queries)
+
+    exact_indices, flat_ms = time_queries(flat_index, queries, top_k)
+    results = [{"index_type": "flat", "search_params": {}, "recall": 1.0, "ms_per_query": flat_ms, "build_seconds": 0.0}]
+
+    for index_type, build_params, search_param_grid in CONFIGS:
+        print(f"🔄 Building {index_type} index...")
+        start_time = time.perf_counter()
+        index, params = build_faiss_index(vectors, index_type, metric=metric, **build_params)
+        build_seconds = time.perf_counter() - start_time
+
+        for search_params in search_param_grid:
+            set_search_params(index, **search_params)
+            approx_indices, ms_per_query = time_queries(index, queries, top_k)
+            results.append({
+                "index_type": index_type,
+                "build_params": params,
+                "search_params": search_params,
+                "recall": recall_at_k(approx_indices, exact_indices),
+                "ms_per_query": ms_per_query,
+                "build_seconds": build_seconds
+            })
+
+    print(f"\n{'index':<10} {'search params':<18} {'recall@' + str(top_k):>10} {'ms/query':>10} {'speedup':>8}")
+    for result in results:
+        search_params = ", ".join(f"{k}={v}" for k, v in result["search_params"].items()) or "-"
+        speedup = flat_ms / result["ms_per_query"] if result["ms_per_query"] else float("inf")
+        print(f"{result['index_type']:<10} {search_params:<18} {result['recall']:>10.3f} {result['ms_per_query']:>10.3f} {speedup:>7.1f}x")
+
+    OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
+        json.dump({"num_vectors": int(flat_index.ntotal), "num_queries": len(queries), "top_k": top_k, "results": results}, f, indent=4)
+    print(f"\nBenchmark results saved to {OUTPUT_PATH}")
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark approximate FAISS indexes against the flat baseline.")
+    parser.add_argument("--queries", type=int, default=500, help="Number of benchmark queries.")
+    parser.add_argument("--top-k", type=int, default=10, help="Neighbors retrieved per query.")
+    parser.add_argument("--noise", type=float, default=0.05, help="Query perturbation, as a fraction of the vector std.")
+    args = parser.parse_args()
+
+    run_benchmark(args.queries, args.top_k, args.noise)
@@ -1,48 +1,156 @@
 import time
+import threading
 import httpx
 from anthropic import Anthropic
 import json
+from llm.request_engine import LLMRequestEngine, RateLimiter, parse_retry_after
+from llm.response_cache import LLMResponseCache
+from llm.batch_runner import ClaudeBatchRunner
 
 class ClaudeLLM:
     """Handles Abthropic Claude AI requests"""
 
-    def __init__(self):
-        self.client = Anthropic(api_key="sk-ant-REDACTED")
+    def __init__(self, max_concurrency=4, requests_per_minute=50, tokens_per_minute=40000,
+                 use_cache=True, bypass_cache=False, cache_path="data_output/llm_response_cache.sqlite", client=None,
+                 section_excerpts=None):
+        """
+        Args:
+            max_concurrency (int): Max number of LLM calls in flight at once.
+            requests_per_minute (int): Request budget shared by all concurrent calls.
+            tokens_per_minute (int): Input + output token budget shared by all concurrent calls.
+            use_cache (bool): Whether to use the on-disk response cache at all.
+            bypass_cache (bool): Skip cache reads (responses are still written back), e.g. to force fresh answers.
+            cache_path (str): SQLite file for the response cache.
+            client: Optional pre-built client, e.g. FakeAnthropicClient for offline runs.
+            section_excerpts (SectionExcerptCache): If given, summarize_modification prompts carry only the
+                                                    passages of long U.S. Code sections relevant to the bill.
+        """
+        self.client = client or Anthropic(api_key="sk-ant-REDACTED")
+
+        self.rate_limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self.engine = LLMRequestEngine(max_concurrency)
+        self.response_cache = LLMResponseCache(cache_path, bypass=bypass_cache) if use_cache else None
+        self.section_excerpts = section_excerpts
+
+        # Static demographics rubric prompt, built once on first use (see get_demographics_system_prompt)
+        self.demographics_system_prompt = None
+        self.demographics_prompt_lock = threading.Lock()
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Runs any ClaudeLLM method (e.g. summarize_modification) on the request engine and returns a Future,
+        so many calls can be in flight at once.
+        """
+        return self.engine.submit(fn, *args, **kwargs)
+
+    def close(self):
+        """Stops the request engine's worker threads once the calls already submitted are done."""
+        self.engine.shutdown()
+
+    @staticmethod
+    def estimate_tokens(prompt, max_tokens, system=None):
+        """Rough input + output token estimate for the tokens-per-minute limiter (~4 characters per token)."""
+        system_length = sum(len(block.get("text", "")) for block in system) if system else 0
+        return (len(prompt) + system_length) // 4 + max_tokens
+
+
+    def run_batch(self, prompts, model="claude-3-haiku-20240307", max_tokens=1024, poll_interval=60, systems=None):
+        """
+        Sends many prompts through the Message Batches API instead of one call each.
+        Prompts already in the response cache are not resubmitted.
+
+        Args:
+            prompts (dict): {custom_id: prompt}. custom_ids must match ^[a-zA-Z0-9_-]{1,64}$.
+            model (str): Claude model to use.
+            max_tokens (int): Max tokens per response.
+            poll_interval (float): Seconds between batch status checks.
+            systems (dict): Optional {custom_id: system content blocks} for prompts that use a system prefix.
+
+        Yields:
+            Tuple[str, Any]: (custom_id, response content) as results become available. Content is None
+                             for requests that errored, expired or were canceled.
+        """
+        systems = systems or {}
+        batch_requests = []
+
+        for custom_id, prompt in prompts.items():
+            system = systems.get(custom_id)
+            cached_response = self.response_cache.get(model, max_tokens, prompt, system) if self.response_cache else None
+            if cached_response is not None:
+                yield custom_id, cached_response
+            else:
+                batch_requests.append(ClaudeBatchRunner.build_request(custom_id, prompt, model, max_tokens, system))
+
+        if not batch_requests:
+            return
+
+        print(f"📦 {len(prompts) - len(batch_requests)} prompts served from cache, batching the other {len(batch_requests)}.")
+        runner = ClaudeBatchRunner(self.client, poll_interval=poll_interval)
+
+        for custom_id, content in runner.run(batch_requests):
+            if self.response_cache and content is not None:
+                self.response_cache.put(model, max_tokens, prompts[custom_id], content, systems.get(custom_id))
+            yield custom_id, content
 
 
         #Can sub model with claude-3-haiku-20240307, claude-3-opus-latest
-    def call_claude_llm(self, prompt, model="claude-3-haiku-20240307", max_retries=3):
+    def call_claude_llm(self, prompt, model="claude-3-haiku-20240307", max_retries=3, max_tokens=1024, system=None):
         """
         Calls Claude LLM API with robust error handling, including rate limits.
+        Safe to call from several threads at once; requests and tokens per minute are shared limits.
         
         Args:
             prompt (str): The input prompt for the LLM.
             model (str): Claude model to use.
             max_retries (int): Maximum retries in case of failure.
+            max_tokens (int): Max tokens in the response.
+            system (list): Optional system content blocks, e.g. a static prefix marked with cache_control.
 
         Returns:
-            str: The response content from Claude, or an error message if it fails.
+            list: The response content blocks from Claude.
+
+        Raises:
+            RuntimeError: If every attempt failed, so callers can drop the request instead of keeping an error message as its answer.
         """
+        if self.response_cache:
+            cached_response = self.response_cache.get(model, max_tokens, prompt, system)
+            if cached_response is not None:
+                print("💾 LLM response served from cache.")
+                return cached_response
+
         attempt = 0
         start_time = time.time()
 
         while attempt < max_retries:
+            self.rate_limiter.acquire(self.estimate_tokens(prompt, max_tokens, system))
+
             try:
-                response = self.client.messages.create(
-                    model=model,
-                    max_tokens=1024,
-                    messages=[{"role": "user", "content": prompt}]
-                )
+                request_params = {
+                    "model": model,
+                    "max_tokens": max_tokens,
+                    "messages": [{"role": "user", "content": prompt}]
+                }
+                if system:
+                    request_params["system"] = system
+
+                response = self.client.messages.create(**request_params)
                 print(f"LLM analysis completed in {time.time() - start_time:.2f} seconds.")
+
+                if self.response_cache:
+                    self.response_cache.put(model, max_tokens, prompt, response.content, system)
+
                 return response.content  #  Return response if successful
 
             except Exception as e:
                 error_msg = str(e).lower()
-
-                # Detect Rate Limit Error
-                if "rate limit" in error_msg or "limit per minute" in error_msg:
-                    print(f"⏳ API rate limit exceeded. Waiting 60 seconds before retrying... (Attempt {attempt + 1}/{max_retries})")
-                    time.sleep(60)  # ⏳ Pause for 60 seconds
+                error_response = getattr(e, "response", None)
+                status_code = getattr(e, "status_code", None) or getattr(error_response, "status_code", None)
+
+                # Detect Rate Limit / Overloaded Error, and wait as long as the API asks us to
+                if status_code in (429, 529) or "rate limit" in error_msg or "limit per minute" in error_msg:
+                    retry_after = parse_retry_after(getattr(error_response, "headers", None))
+                    print(f"⏳ API rate limit exceeded. Waiting {retry_after:.0f} seconds before retrying... (Attempt {attempt + 1}/{max_retries})")
+                    self.rate_limiter.back_off(retry_after)  # ⏳ Pauses every worker, not just this one
                     attempt += 1
                     continue
 
@@ -51,7 +159,7 @@ class ClaudeLLM:
                 attempt += 1
                 time.sleep(5)  # Small delay before retrying non-rate-limit errors
 
-        return "AI analysis failed after multiple retries."
+        raise RuntimeError(f"AI analysis failed after {max_retries} attempts.")
 
 
     def summarize_modification(self, original_text, modified_text, section_id, became_law):
@@ -71,22 +179,41 @@ class ClaudeLLM:
 
         Returns:
             TextBlock: The response from the Claude API containing the summary.
-            If an error occurs, returns None.
+            Raises RuntimeError if the call keeps failing (see call_claude_llm).
         """
 
         print(f"Calling LLM to summarize modifications for {section_id}...")
         start_time = time.time()
 
-        if not original_text or not modified_text:
+        prompt = self.build_modification_prompt(original_text, modified_text, section_id, became_law)
+        if prompt is None:
             return "No valid U.S. Code or bill text found."
 
+        return self.call_claude_llm(prompt)
+
+    def build_modification_prompt(self, original_text, modified_text, section_id, became_law):
+        """
+        Builds the summarize_modification prompt without sending it, so it can also be submitted in a batch.
+
+        Returns:
+            str: The prompt, or None if either text is missing.
+        """
+        if not original_text or not modified_text:
+            return None
+
         passed_status = "has already become law" if became_law else "has not yet passed into law"
 
+        section_heading = "Original U.S. Code Section"
+        if self.section_excerpts:
+            original_text, excerpted = self.section_excerpts.excerpt(original_text, modified_text)
+            if excerpted:
+                section_heading = "Relevant Excerpts of U.S. Code Section, [...] marks omitted passages"
+
         prompt = f"""
         A proposed bill modifies the following section of the U.S. Code.
         This bill {passed_status}.
 
-        **Original U.S. Code Section ({section_id}):**
+        **{section_heading} ({section_id}):**
         {original_text}
 
         **Modified Bill Text:**
@@ -112,13 +239,23 @@ class ClaudeLLM:
         }}
         """
 
-        return self.call_claude_llm(prompt)
+        return prompt
 
 
 
     def identify_affected_demographics(self, bill_text, matched_us_code_sections):
         print("📝 Asking LLM to identify affected demographic groups...")
 
+        return self.call_claude_llm(
+            self.build_demographics_prompt(bill_text, matched_us_code_sections),
+            system=self.get_demographics_system_prompt()
+        )
+
+    def build_demographic_rubric_prompt(self):
+        """
+        Builds the "Demographic Groups and Rubrics" block. Each rubric group is written once,
+        followed by the demographic groups it applies to, instead of repeating the rubric per subgroup.
+        """
         # Load demographic groups and rubrics
         with open("data/demographic_data.json", "r") as f:
             demographic_data = json.load(f)
@@ -126,31 +263,44 @@ class ClaudeLLM:
         with open("data/demographic_rubrics.json", "r") as f:
             rubric_templates = json.load(f)
 
-        demographic_blocks = []
+        groups_by_rubric = {}
         for category, subgroups in demographic_data.items():
             rubric_key = category if isinstance(subgroups, dict) and "_rubric_group" not in subgroups else subgroups.get("_rubric_group")
-            rubric = rubric_templates.get(rubric_key, "")
             for subgroup in subgroups:
                 if subgroup == "_rubric_group":
                     continue
-                demographic_blocks.append(f'"{category} - {subgroup}": "Use the following rubric to evaluate impact:\n{rubric}"')
+                groups_by_rubric.setdefault(rubric_key, []).append(f'"{category} - {subgroup}"')
 
-        rubric_prompt = "\n\n".join(demographic_blocks)
+        rubric_blocks = []
+        for rubric_key, group_names in groups_by_rubric.items():
+            rubric = rubric_templates.get(rubric_key, "")
+            rubric_blocks.append(
+                f"Rubric \"{rubric_key}\" applies to: {', '.join(group_names)}\n"
+                f"Use the following rubric to evaluate impact:\n{rubric}"
+            )
 
-        matched_sections_str = "\n".join([section["section_id"] for section in matched_us_code_sections])
+        return "\n\n".join(rubric_blocks)
 
-        prompt = f"""
-        A bill has been introduced that modifies sections of the U.S. Code.
+    def get_demographics_system_prompt(self):
+        """
+        Returns the static part of the demographics prompt (instructions, every group and its rubric,
+        and the return format) as a system block marked for prompt caching. It is built once per
+        client; only the bill text varies between demographics calls.
+        """
+        with self.demographics_prompt_lock:
+            if self.demographics_system_prompt is None:
+                self.demographics_system_prompt = self.compile_demographics_system_prompt()
 
-        **Bill Text:**
-        {bill_text}
+        return self.demographics_system_prompt
 
-        **Relevant U.S. Code Sections:**
-        {matched_sections_str}
+    def compile_demographics_system_prompt(self):
+        """Builds the cacheable demographics system block. Use get_demographics_system_prompt() instead of calling this per request."""
+        rubric_prompt = self.build_demographic_rubric_prompt()
 
-        **Instructions:**
+        system_text = f"""
+        You are tasked with evaluating the impact of a bill on a wide range of demographic groups.
 
-        You are tasked with evaluating the impact of this bill on a wide range of demographic groups.
+        **Instructions:**
 
         Follow these steps:
 
@@ -184,11 +334,11 @@ class ClaudeLLM:
         **Return Format (JSON):**
         A JSON object with exactly 5 entries in the following format:
         {{
-           "Group 1 Name": { ... },
-           "Group 2 Name": { ... },
-           "Group 3 Name": { ... },
-           "Group 4 Name": { ... },
-           "Group 5 Name": { ... }
+           "Group 1 Name": {{ ... }},
+           "Group 2 Name": {{ ... }},
+           "Group 3 Name": {{ ... }},
+           "Group 4 Name": {{ ... }},
+           "Group 5 Name": {{ ... }}
         }}
 
         **Example Output:**
@@ -206,12 +356,28 @@ class ClaudeLLM:
         }}
         """
 
+        # cache_control lets the API reuse this prefix across calls instead of re-processing it each time
+        return [
+            {"type": "text", "text": system_text, "cache_control": {"type": "ephemeral"}}
+        ]
 
-        return self.call_claude_llm(prompt)
-
-
+    def build_demographics_prompt(self, bill_text, matched_us_code_sections):
+        """
+        Builds the bill-specific user message for identify_affected_demographics without sending it,
+        so it can also be submitted in a batch. The rubrics live in get_demographics_system_prompt().
+        """
+        matched_sections_str = "\n".join([section["section_id"] for section in matched_us_code_sections])
 
+        prompt = f"""
+        A bill has been introduced that modifies sections of the U.S. Code.
 
+        **Bill Text:**
+        {bill_text}
 
+        **Relevant U.S. Code Sections:**
+        {matched_sections_str}
 
+        Evaluate this bill's impact on the demographic groups following the instructions, rubrics and return format above.
+        """
 
+        return prompt
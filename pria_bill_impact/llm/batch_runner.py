@@ -0,0 +1,86 @@
+import time
+
+
+class ClaudeBatchRunner:
+    """
+    Submits many prompts at once through the Message Batches API, polls until the batch has
+    ended, and streams the results back. Batches are slower to come back than direct calls
+    (up to 24 hours) but are billed at a discount, which suits overnight runs over a whole Congress.
+    """
+
+    # The API caps a single batch at 100,000 requests; keep batches smaller so one failure doesn't cost everything
+    MAX_REQUESTS_PER_BATCH = 10000
+
+    def __init__(self, client, poll_interval=60, max_wait_seconds=24 * 60 * 60):
+        """
+        Args:
+            client: An Anthropic client (or FakeAnthropicClient for offline runs).
+            poll_interval (float): Seconds between batch status checks.
+            max_wait_seconds (float): Give up waiting on a batch after this long.
+        """
+        self.client = client
+        self.poll_interval = poll_interval
+        self.max_wait_seconds = max_wait_seconds
+
+    @staticmethod
+    def build_request(custom_id, prompt, model="claude-3-haiku-20240307", max_tokens=1024, system=None):
+        """Builds a single batch request entry in the Message Batches API format."""
+        request = {
+            "custom_id": custom_id,
+            "params": {
+                "model": model,
+                "max_tokens": max_tokens,
+                "messages": [{"role": "user", "content": prompt}]
+            }
+        }
+        if system:
+            request["params"]["system"] = system
+        return request
+
+    def submit(self, requests):
+        """Creates a batch and returns its id."""
+        batch = self.client.messages.batches.create(requests=requests)
+        print(f"📦 Submitted batch {batch.id} with {len(requests)} requests.")
+        return batch.id
+
+    def wait(self, batch_id):
+        """Polls a batch until its processing_status is "ended"."""
+        start_time = time.time()
+
+        while True:
+            batch = self.client.messages.batches.retrieve(batch_id)
+            if batch.processing_status == "ended":
+                print(f"✅ Batch {batch_id} ended after {time.time() - start_time:.0f} seconds.")
+                return batch
+
+            if time.time() - start_time > self.max_wait_seconds:
+                raise TimeoutError(f"Batch {batch_id} did not finish within {self.max_wait_seconds} seconds.")
+
+            counts = getattr(batch, "request_counts", None)
+            print(f"⏳ Batch {batch_id} is {batch.processing_status} ({counts}). Checking again in {self.poll_interval} seconds...")
+            time.sleep(self.poll_interval)
+
+    def stream_results(self, batch_id):
+        """
+        Yields (custom_id, content) for every request in an ended batch. Content is the response's
+        content blocks, or None for requests that errored, expired or were canceled.
+        """
+        for entry in self.client.messages.batches.results(batch_id):
+            if entry.result.type == "succeeded":
+                yield entry.custom_id, entry.result.message.content
+            else:
+                print(f"❌ Batch request {entry.custom_id} {entry.result.type}.")
+                yield entry.custom_id, None
+
+    def run(self, requests):
+        """
+        Submits requests in batches of at most MAX_REQUESTS_PER_BATCH, waits for each, and yields
+        (custom_id, content) as results come back.
+        """
+        batch_ids = []
+        for i in range(0, len(requests), self.MAX_REQUESTS_PER_BATCH):
+            batch_ids.append(self.submit(requests[i:i + self.MAX_REQUESTS_PER_BATCH]))
+
+        for batch_id in batch_ids:
+            self.wait(batch_id)
+            yield from self.stream_results(batch_id)
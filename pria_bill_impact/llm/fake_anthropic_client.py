@@ -0,0 +1,89 @@
+import itertools
+import json
+from types import SimpleNamespace
+
+
+def fake_response_text(prompt):
+    """Returns a canned JSON answer shaped like what the analyzer's prompts ask Claude for."""
+    if "Demographic Groups and Rubrics" in prompt:
+        return json.dumps({
+            "Income - Low-Income": {
+                "impact_score": 0,
+                "justification": "Fake response for offline testing.",
+                "estimated_monetary_impact": ""
+            }
+        })
+
+    return json.dumps({
+        "change_type": "Minor",
+        "summary_of_changes": ["Fake response for offline testing."],
+        "legal_impact": "None",
+        "relevance_score": 0,
+        "relevance_explanation": "Fake response for offline testing.",
+        "before_and_after": {"before": "", "after": ""}
+    })
+
+
+def text_from_content(content):
+    """Flattens a string or a list of content blocks into plain text."""
+    if isinstance(content, list):
+        return "\n".join(block.get("text", "") for block in content)
+    return content or ""
+
+
+def prompt_from_params(params):
+    """Pulls the system and user prompt text out of Messages API params."""
+    return text_from_content(params.get("system")) + "\n" + text_from_content(params["messages"][-1]["content"])
+
+
+class FakeMessageBatches:
+    """In-memory stand-in for client.messages.batches. Each batch reports in_progress once, then ended."""
+
+    def __init__(self, responder):
+        self.responder = responder
+        self.batches = {}
+        self.ids = itertools.count(1)
+
+    def create(self, requests):
+        batch_id = f"msgbatch_fake_{next(self.ids)}"
+        self.batches[batch_id] = {"requests": list(requests), "polls": 0}
+        return SimpleNamespace(id=batch_id, processing_status="in_progress")
+
+    def retrieve(self, batch_id):
+        batch = self.batches[batch_id]
+        batch["polls"] += 1
+        status = "ended" if batch["polls"] > 1 else "in_progress"
+        return SimpleNamespace(
+            id=batch_id,
+            processing_status=status,
+            request_counts={"processing": 0 if status == "ended" else len(batch["requests"])}
+        )
+
+    def results(self, batch_id):
+        for request in self.batches[batch_id]["requests"]:
+            text = self.responder(prompt_from_params(request["params"]))
+            message = SimpleNamespace(content=[SimpleNamespace(type="text", text=text)])
+            yield SimpleNamespace(
+                custom_id=request["custom_id"],
+                result=SimpleNamespace(type="succeeded", message=message)
+            )
+
+
+class FakeMessages:
+    def __init__(self, responder):
+        self.responder = responder
+        self.batches = FakeMessageBatches(responder)
+
+    def create(self, model, max_tokens, messages, system=None, **kwargs):
+        text = self.responder(prompt_from_params({"messages": messages, "system": system}))
+        return SimpleNamespace(content=[SimpleNamespace(type="text", text=text)])
+
+
+class FakeAnthropicClient:
+    """
+    Offline stand-in for anthropic.Anthropic covering messages.create and messages.batches,
+    so the analyzer (including batch mode) can run without network access or an API key.
+    """
+
+    def __init__(self, responder=fake_response_text):
+        self.messages = FakeMessages(responder)
@@ -0,0 +1,110 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. Holds up to `capacity` tokens and refills at `capacity` per `period`
+    seconds, so capacity=50, period=60 means 50 requests (or tokens) per minute.
+    """
+
+    def __init__(self, capacity, period=60.0):
+        self.capacity = float(capacity)
+        self.refill_rate = self.capacity / period
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.refill_rate)
+        self.last_refill = now
+
+    def acquire(self, amount=1):
+        """Blocks until `amount` tokens are available, then takes them."""
+        amount = min(float(amount), self.capacity)  # A single oversized request must still be able to run
+
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait_time = (amount - self.tokens) / self.refill_rate
+
+            time.sleep(wait_time)
+
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute limits shared by every worker thread, plus a shared
+    pause used when the API tells us to back off (retry-after), so all workers wait, not just the one that hit it.
+    """
+
+    def __init__(self, requests_per_minute=50, tokens_per_minute=40000):
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.resume_at = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self, estimated_tokens):
+        """Waits for any shared back-off to end, then for request and token budget."""
+        while True:
+            with self.lock:
+                wait_time = self.resume_at - time.monotonic()
+            if wait_time <= 0:
+                break
+            time.sleep(wait_time)
+
+        self.request_bucket.acquire(1)
+        self.token_bucket.acquire(estimated_tokens)
+
+    def back_off(self, seconds):
+        """Pauses all callers of acquire() for `seconds`."""
+        with self.lock:
+            self.resume_at = max(self.resume_at, time.monotonic() + seconds)
+
+
+def parse_retry_after(headers, default=60.0):
+    """
+    Reads a retry-after header (seconds or an HTTP date) and returns how long to wait in seconds.
+    Falls back to `default` if the header is missing or unreadable.
+    """
+    if not headers:
+        return default
+
+    value = headers.get("retry-after")
+    if value is None:
+        return default
+
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        pass
+
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return default
+
+
+class LLMRequestEngine:
+    """
+    Runs LLM calls concurrently on a bounded thread pool. The Anthropic client is synchronous,
+    so threads are enough to overlap network round-trips; rate limits are enforced by RateLimiter
+    inside the call itself.
+    """
+
+    def __init__(self, max_concurrency=4):
+        self.max_concurrency = max_concurrency
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="llm")
+
+    def submit(self, fn, *args, **kwargs):
+        """Schedules fn(*args, **kwargs) and returns a Future."""
+        return self.executor.submit(fn, *args, **kwargs)
+
+    def shutdown(self):
+        """Waits for the calls already submitted, then stops the worker threads."""
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,134 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+class LLMResponseCache:
+    """
+    Persistent SQLite cache of Claude responses, keyed by a hash of (model, max_tokens, prompt)
+    plus the system prompt when one is used.
+    Identical prompts (e.g. the same bill/section pair across reruns or experiments) are answered
+    from disk instead of costing another API call.
+
+    Entries older than max_age_seconds are treated as misses, and the least recently used entries
+    are evicted once the cache grows past max_bytes.
+    """
+
+    def __init__(self, cache_path="data_output/llm_response_cache.sqlite", max_bytes=500 * 1024 * 1024,
+                 max_age_seconds=None, bypass=False):
+        """
+        Args:
+            cache_path (str | Path): SQLite file backing the cache.
+            max_bytes (int): Max total size of cached responses before LRU eviction.
+            max_age_seconds (float): Entries older than this are ignored and removed. None keeps them forever.
+            bypass (bool): If True, never read from the cache (fresh responses are still written back).
+        """
+        self.cache_path = Path(cache_path)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.bypass = bypass
+
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.cache_path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                max_tokens INTEGER,
+                response TEXT,
+                size INTEGER,
+                created_at REAL,
+                last_used REAL
+            )"""
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses (last_used)")
+        self.conn.commit()
+
+    @staticmethod
+    def make_key(model, max_tokens, prompt, system=None):
+        """Content address for a request: sha256 over the model, max_tokens, the full prompt and any system blocks."""
+        request = [model, max_tokens, prompt]
+        if system:
+            request.append(system)
+        payload = json.dumps(request, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, model, max_tokens, prompt, system=None):
+        """Returns the cached response content blocks, or None on a miss."""
+        if self.bypass:
+            return None
+
+        key = self.make_key(model, max_tokens, prompt, system)
+        now = time.time()
+
+        with self.lock:
+            row = self.conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+
+            if row and self.max_age_seconds is not None and now - row[1] > self.max_age_seconds:
+                self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.conn.commit()
+                row = None
+
+            if not row:
+                self.misses += 1
+                return None
+
+            self.conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+            self.hits += 1
+
+        return json.loads(row[0])
+
+    def put(self, model, max_tokens, prompt, content, system=None):
+        """
+        Stores a response. `content` is the list of content blocks returned by the Messages API;
+        only the text of each block is kept, in the dict form parse_textblock already understands.
+        """
+        blocks = [
+            {"type": "text", "text": block.text if hasattr(block, "text") else block["text"]}
+            for block in content
+        ]
+        response = json.dumps(blocks, ensure_ascii=False)
+        now = time.time()
+
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self.make_key(model, max_tokens, prompt, system), model, max_tokens, response, len(response), now, now)
+            )
+            self.conn.commit()
+
+        self.evict()
+        return blocks
+
+    def evict(self):
+        """Drops expired entries, then least recently used ones until the cache fits in max_bytes."""
+        with self.lock:
+            if self.max_age_seconds is not None:
+                self.conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.max_age_seconds,))
+
+            total_size = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if self.max_bytes is not None and total_size > self.max_bytes:
+                excess = total_size - self.max_bytes
+                freed = 0
+                for key, size in self.conn.execute("SELECT key, size FROM responses ORDER BY last_used").fetchall():
+                    if freed >= excess:
+                        break
+                    self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    freed += size
+
+            self.conn.commit()
+
+    def stats(self):
+        """Returns hit/miss counters and the current number of cached entries."""
+        with self.lock:
+            entries, total_size = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": total_size}
@@ -0,0 +1,204 @@
+import hashlib
+import json
+import math
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+
+# A subsection/paragraph enumerator such as "(a) ", "(2) ", "(B) " or "(iv) " that starts a passage, as
+# opposed to a cross-reference like "subsection (a) of" (processed section text has no periods to split on)
+PASSAGE_START_RE = re.compile(
+    r"(?<!section )(?<!paragraph )(?<!clause )(?<!under )(?<!and )(?<!or )(?<!in )(?<!of )(?<!to )(?<!by )"
+    r"(?<=\s)(?=\((?:[a-zA-Z]{1,2}|[0-9]{1,3}|[ivxl]{1,6})\)\s)"
+)
+CITED_PASSAGE_RE = re.compile(r"(?:sub)?(?:section|paragraph|clause)\s+((?:\([a-zA-Z0-9]{1,6}\))+)", re.IGNORECASE)
+TERM_RE = re.compile(r"[a-z][a-z0-9']{3,}")
+STOP_TERMS = frozenset(
+    "that this with from such shall under section subsection paragraph clause subparagraph title which "
+    "other than their there these those into including each been have made where after before date code "
+    "united states amended striking inserting following term means".split()
+)
+
+MAX_PASSAGE_WORDS = 150  # Passages without enumerators are cut into windows of this many words
+# Score added to a passage the bill cites by enumerator; bounded, since "subsection (b)" may be another section's
+CITED_PASSAGE_BOOST = 10.0
+
+
+def estimate_tokens(text):
+    """~4 characters per token, the same estimate ClaudeLLM uses for rate limiting."""
+    return len(text) // 4
+
+
+def truncate_passage(passage, max_tokens):
+    """The start of passage, cut at a word boundary and followed by "[...]", within max_tokens. None if no word fits."""
+    max_chars = max_tokens * 4 - len(" [...]")
+    cut = passage[:max_chars + 1]
+    if len(cut) > max_chars:
+        cut = cut.rsplit(" ", 1)[0][:max_chars]  # Keeps the word at the cut only if it ends right there
+    return f"{cut} [...]" if max_chars > 0 and cut else None
+
+
+def text_terms(text):
+    return set(TERM_RE.findall(text.lower())) - STOP_TERMS
+
+
+def split_passages(section_text):
+    """Splits a section at its subsection/paragraph enumerators, and long unstructured stretches into word windows."""
+    passages = []
+    for passage in PASSAGE_START_RE.split(section_text):
+        words = passage.split()
+        for start in range(0, len(words), MAX_PASSAGE_WORDS):
+            passages.append(" ".join(words[start:start + MAX_PASSAGE_WORDS]))
+    return [passage for passage in passages if passage]
+
+
+class SectionExcerptCache:
+    """
+    Section-side work for excerpting U.S. Code sections in summarize_modification prompts, keyed by a
+    sha256 of the section text: the section's passages (split at subsection/paragraph enumerators)
+    with their token counts. A hot section (say a 26 U.S.C. or 42 U.S.C. health provision amended by
+    dozens of bills) is split once and reused by every bill that matches it, across runs.
+
+    excerpt() then compares a bill with the section and keeps the passages the bill touches first:
+    passages it cites ("subsection (b)(2)") and those sharing the most distinctive terms with it. The
+    best of them that doesn't fit is cut down to what's left of the token budget rather than dropped,
+    and any budget still left is filled with the other passages in section order. Sections already
+    under the budget are sent whole.
+
+    Passages are stored in SQLite, and the most recently used sections are also kept in memory.
+    """
+
+    def __init__(self, cache_path="data_output/section_excerpt_cache.sqlite", max_tokens=1500, memory_items=2048):
+        """
+        Args:
+            cache_path (str | Path): SQLite file holding each section's passages.
+            max_tokens (int): Token budget of an excerpt (estimated at ~4 characters per token).
+            memory_items (int): Sections kept in memory, with their passage terms.
+        """
+        self.cache_path = Path(cache_path)
+        self.max_tokens = max_tokens
+        self.memory_items = memory_items
+
+        self.memory = OrderedDict()  # section hash → (passages, token counts, passage terms)
+        self.lock = threading.Lock()
+        self.counters = {"sections": 0, "excerpted": 0, "section_tokens": 0, "excerpt_tokens": 0}
+
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.cache_path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS sections (section_hash TEXT PRIMARY KEY, token_count INTEGER, passages TEXT)"
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def section_hash(section_text):
+        return hashlib.sha256(section_text.encode("utf-8")).hexdigest()
+
+    def section_passages(self, section_text):
+        """Returns (passages, passage token counts, passage term sets) for a section, splitting it on first use."""
+        section_hash = self.section_hash(section_text)
+
+        with self.lock:
+            if section_hash in self.memory:
+                self.memory.move_to_end(section_hash)
+                return self.memory[section_hash]
+
+            row = self.conn.execute("SELECT passages FROM sections WHERE section_hash = ?", (section_hash,)).fetchone()
+
+        if row:
+            passages = json.loads(row[0])
+        else:
+            passages = split_passages(section_text)
+            with self.lock:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO sections VALUES (?, ?, ?)",
+                    (section_hash, estimate_tokens(section_text), json.dumps(passages))
+                )
+                self.conn.commit()
+
+        entry = (passages, [estimate_tokens(passage) for passage in passages], [text_terms(passage) for passage in passages])
+        with self.lock:
+            self.memory[section_hash] = entry
+            while len(self.memory) > self.memory_items:
+                self.memory.popitem(last=False)
+        return entry
+
+    def excerpt(self, section_text, bill_text):
+        """
+        The parts of section_text relevant to bill_text, in section order, with "[...]" marking skipped
+        passages. Returns (text, excerpted) where excerpted is False if the whole section fits the budget.
+        """
+        section_tokens = estimate_tokens(section_text)
+        if section_tokens <= self.max_tokens:
+            self._count(section_tokens, section_tokens, excerpted=False)
+            return section_text, False
+
+        passages, token_counts, passage_terms = self.section_passages(section_text)
+        bill_terms = text_terms(bill_text)
+        cited_labels = {match.group(1).lower() for match in CITED_PASSAGE_RE.finditer(bill_text)}
+
+        # Terms found in fewer of the section's passages say more about which passage the bill touches
+        document_frequency = {}
+        for terms in passage_terms:
+            for term in terms & bill_terms:
+                document_frequency[term] = document_frequency.get(term, 0) + 1
+
+        scores = []
+        for i, (passage, terms) in enumerate(zip(passages, passage_terms)):
+            score = sum(math.log(1 + len(passages) / document_frequency[term]) for term in terms & bill_terms)
+            label = passage.split(" ", 1)[0].lower()
+            if label.startswith("(") and any(cited.startswith(label) for cited in cited_labels):
+                score += CITED_PASSAGE_BOOST
+            if i == 0:
+                score += 1  # The lead-in names what the section covers
+            scores.append(score)
+
+        selected, used_tokens = set(), 0
+        truncated = {}  # passage index → its start, for the best passage that doesn't fit whole
+        for i in sorted(range(len(passages)), key=lambda i: scores[i], reverse=True):
+            if scores[i] <= 0:
+                break
+            if used_tokens + token_counts[i] <= self.max_tokens:
+                selected.add(i)
+                used_tokens += token_counts[i]
+            elif not truncated:
+                passage_start = truncate_passage(passages[i], self.max_tokens - used_tokens)
+                if passage_start:
+                    truncated[i] = passage_start
+                    selected.add(i)
+                    used_tokens += estimate_tokens(passage_start)
+
+        # Spend what's left of the budget on the remaining passages in section order, so a bill that
+        # shares little vocabulary with the section (e.g. a FAISS fallback match) still sees its text
+        for i in range(len(passages)):
+            if i not in selected and used_tokens + token_counts[i] <= self.max_tokens:
+                selected.add(i)
+                used_tokens += token_counts[i]
+
+        parts = []
+        for i, passage in enumerate(passages):
+            if i in selected:
+                parts.append(truncated.get(i, passage))
+            elif not parts or not parts[-1].endswith("[...]"):
+                parts.append("[...]")
+        excerpt_text = " ".join(parts)
+
+        self._count(section_tokens, estimate_tokens(excerpt_text), excerpted=True)
+        return excerpt_text, True
+
+    def _count(self, section_tokens, excerpt_tokens, excerpted):
+        with self.lock:
+            self.counters["sections"] += 1
+            self.counters["excerpted"] += int(excerpted)
+            self.counters["section_tokens"] += section_tokens
+            self.counters["excerpt_tokens"] += excerpt_tokens
+
+    def stats(self):
+        """Sections seen and excerpted, and their estimated tokens before and after excerpting."""
+        with self.lock:
+            cached_sections = self.conn.execute("SELECT COUNT(*) FROM sections").fetchone()[0]
+            return {**self.counters, "cached_sections": cached_sections}
@@ -0,0 +1,86 @@
+from pathlib import Path
+
+import numpy as np
+
+
+class CompactLookup:
+    """
+    Array-backed replacement for the FAISS lookup JSON list (index row → identifier).
+
+    Identifiers are stored as one UTF-8 blob plus an int64 offsets array, next to an int64 array of
+    each row's position in the U.S. Code store (-1 where it doesn't apply, e.g. demographics).
+    All three files are memory-mapped on load, so worker processes share them through the page
+    cache instead of each parsing its own copy of a large JSON list.
+
+    Files written for an index at faiss_indexes/faiss_us_code.index:
+        faiss_us_code.lookup.offsets.npy, faiss_us_code.lookup.blob, faiss_us_code.lookup.rows.npy
+    """
+
+    def __init__(self, offsets, blob, rows):
+        self.offsets = offsets
+        self.blob = blob
+        self.rows = rows
+
+    @staticmethod
+    def sidecar_paths(index_path):
+        index_path = Path(index_path)
+        return (
+            index_path.with_suffix(".lookup.offsets.npy"),
+            index_path.with_suffix(".lookup.blob"),
+            index_path.with_suffix(".lookup.rows.npy"),
+        )
+
+    @classmethod
+    def exists(cls, index_path):
+        return all(path.exists() for path in cls.sidecar_paths(index_path))
+
+    @classmethod
+    def save(cls, index_path, identifiers, rows=None):
+        """
+        Writes the sidecar files for an index.
+
+        :param identifiers: Identifier per index row (section ID, or "Category - Group" for demographics).
+        :param rows: Optional position of each row's section in the U.S. Code store.
+        """
+        offsets_path, blob_path, rows_path = cls.sidecar_paths(index_path)
+
+        encoded = [identifier.encode("utf-8") for identifier in identifiers]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(value) for value in encoded])
+
+        np.save(offsets_path, offsets)
+        with open(blob_path, "wb") as f:
+            f.write(b"".join(encoded))
+        np.save(rows_path, np.asarray(rows if rows is not None else [-1] * len(encoded), dtype=np.int64))
+
+    @classmethod
+    def load(cls, index_path, mmap=True):
+        """Loads the sidecar files, memory-mapped by default."""
+        offsets_path, blob_path, rows_path = cls.sidecar_paths(index_path)
+        mmap_mode = "r" if mmap else None
+
+        offsets = np.load(offsets_path, mmap_mode=mmap_mode)
+        rows = np.load(rows_path, mmap_mode=mmap_mode)
+
+        if blob_path.stat().st_size == 0:  # np.memmap can't map an empty file
+            blob = np.zeros(0, dtype=np.uint8)
+        elif mmap:
+            blob = np.memmap(blob_path, dtype=np.uint8, mode="r")
+        else:
+            blob = np.fromfile(blob_path, dtype=np.uint8)
+
+        return cls(offsets, blob, rows)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"Lookup index {index} out of range.")
+        return bytes(self.blob[self.offsets[index]:self.offsets[index + 1]]).decode("utf-8")
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
@@ -25,3 +25,12 @@ class DemographicMatcher:
         """
         results = self.demographic_faiss.search_faiss(bill_text, top_k)
         return [(demographic, float(score)) for demographic, score in results]  # Ensure JSON serializable scores
+
+    def find_similar_demographic_groups_batch(self, bill_texts, top_k=5):
+        """Batch version of find_similar_demographic_groups: one encode pass and one FAISS search for all bills.
+
+        Returns:
+            List[List[Tuple[str, float]]]: One result list per bill, in the same order as bill_texts.
+        """
+        batch_results = self.demographic_faiss.search_faiss_batch(bill_texts, top_k)
+        return [[(demographic, float(score)) for demographic, score in results] for results in batch_results]
@@ -1,29 +1,271 @@
 import faiss
 import numpy as np
-from sentence_transformers import SentenceTransformer
+from models.embedder_registry import get_embedder
+from models.compact_lookup import CompactLookup
+from models.embedding_cache import get_embedding_cache
 from pathlib import Path
+import argparse
+import hashlib
 import json
 
 
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw")
+METRICS = ("l2", "cosine")
+
+
+def build_faiss_index(embeddings, index_type="flat", nlist=None, pq_m=48, hnsw_m=32, train_sample_size=100000, seed=42,
+                      metric="l2", with_ids=False):
+    """
+    Builds a FAISS index of the given type over float32 embeddings.
+
+    With metric="cosine" the index uses inner product, and embeddings must already be L2-normalized
+    (see normalize_embeddings), so the scores it returns are cosine similarities.
+
+    - "flat": exact brute-force search (IndexFlatL2), the baseline.
+    - "ivf_flat": inverted file over `nlist` k-means clusters, searching only the `nprobe` closest clusters.
+    - "ivf_pq": like ivf_flat, but vectors are product-quantized into `pq_m` bytes each (much smaller, approximate distances).
+    - "hnsw": hierarchical navigable small-world graph with `hnsw_m` links per node. No training needed.
+
+    IVF indexes are trained on a random sample of at most `train_sample_size` vectors.
+
+    With with_ids=True, vectors can later be added and removed by id (see supports_updates): flat indexes are
+    wrapped in an IndexIDMap2 and IVF indexes use their native ids. Either way, the ids given to `embeddings`
+    are 0..N-1, the same as the row numbers a plain index would use.
+
+    :return: (index, params) where params holds the settings actually used, for persisting next to the index.
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type '{index_type}', expected one of {INDEX_TYPES}.")
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric '{metric}', expected one of {METRICS}.")
+
+    num_vectors, dimension = embeddings.shape
+    params = {"index_type": index_type, "metric": metric}
+    faiss_metric = faiss.METRIC_INNER_PRODUCT if metric == "cosine" else faiss.METRIC_L2
+
+    if index_type == "flat":
+        index = faiss.IndexFlatIP(dimension) if metric == "cosine" else faiss.IndexFlatL2(dimension)
+
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dimension, hnsw_m, faiss_metric)
+        index.hnsw.efConstruction = 80
+        params["hnsw_m"] = hnsw_m
+
+    else:
+        # FAISS wants ~39 training points per cluster; default to ~4 * sqrt(N) clusters
+        if nlist is None:
+            nlist = int(4 * np.sqrt(num_vectors))
+        nlist = max(1, min(nlist, num_vectors // 39 or 1))
+
+        quantizer = faiss.IndexFlatIP(dimension) if metric == "cosine" else faiss.IndexFlatL2(dimension)
+        if index_type == "ivf_flat":
+            index = faiss.IndexIVFFlat(quantizer, dimension, nlist, faiss_metric)
+        else:
+            if dimension % pq_m != 0:
+                raise ValueError(f"pq_m ({pq_m}) must divide the embedding dimension ({dimension}).")
+            index = faiss.IndexIVFPQ(quantizer, dimension, nlist, pq_m, 8, faiss_metric)
+            params["pq_m"] = pq_m
+        params["nlist"] = nlist
+
+        rng = np.random.default_rng(seed)
+        sample_size = min(train_sample_size, num_vectors)
+        sample = embeddings[rng.choice(num_vectors, sample_size, replace=False)]
+        print(f"  🔹 Training {index_type} index ({nlist} clusters) on {sample_size} vectors...")
+        index.train(sample)
+
+    if with_ids and index_type == "flat":
+        index = faiss.IndexIDMap2(index)
+
+    if with_ids and index_type != "hnsw":
+        index.add_with_ids(embeddings, np.arange(num_vectors, dtype="int64"))
+    else:
+        index.add(embeddings)
+    return index, params
+
+
+def supports_updates(index):
+    """True if vectors can be added and removed by id (IndexIDMap2-wrapped or IVF). HNSW graphs can't remove vectors."""
+    return isinstance(index, (faiss.IndexIDMap2, faiss.IndexIVF))
+
+
+def content_hash(text):
+    """SHA-256 of a section's content, used to tell which sections changed between U.S. Code release points."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def normalize_embeddings(embeddings):
+    """Returns a float32 copy of the embeddings scaled to unit length, so inner product equals cosine similarity."""
+    embeddings = np.ascontiguousarray(embeddings, dtype="float32").copy()
+    faiss.normalize_L2(embeddings)
+    return embeddings
+
+
+def set_search_params(index, nprobe=None, ef_search=None):
+    """Sets query-time accuracy/speed knobs: nprobe for IVF indexes, efSearch for HNSW. Other index types ignore them."""
+    if nprobe is not None and hasattr(index, "nprobe"):
+        index.nprobe = nprobe
+    if ef_search is not None and hasattr(index, "hnsw"):
+        index.hnsw.efSearch = ef_search
+
+
 class EmbeddingFAISSManager:
     """Handles embedding creation and FAISS index management for different types of data."""
 
-    def __init__(self, model_name="sentence-transformers/all-MiniLM-L12-v2"):
-        self.embedding_model = SentenceTransformer(model_name)
+    def __init__(self, model_name="sentence-transformers/all-MiniLM-L12-v2", batch_size=64, num_processes=0,
+                 chunk_size=96, chunk_overlap=24, index_type="flat", nlist=None, pq_m=48, hnsw_m=32,
+                 nprobe=16, ef_search=64, metric="l2", embedding_cache_dir="data_output/embedding_cache"):
+        """
+        :param model_name: Sentence Transformers model used for all embeddings. The model itself is shared
+                           process-wide and only loaded on first use (see models/embedder_registry.py).
+        :param batch_size: Number of texts encoded per forward pass in create_embeddings.
+        :param num_processes: If > 1, create_embeddings encodes on a pool of that many CPU processes
+                              (useful on CPU-only machines). 0 or 1 encodes in this process.
+        :param chunk_size: Words per chunk in chunked mode. all-MiniLM-L12-v2 truncates at 128 word pieces,
+                           which is roughly 96 words of legal text.
+        :param chunk_overlap: Words shared between consecutive chunks.
+        :param index_type: U.S. Code index type: "flat", "ivf_flat", "ivf_pq" or "hnsw" (see build_faiss_index).
+        :param nlist: Number of IVF clusters (default ~4 * sqrt(N)).
+        :param pq_m: Bytes per vector for ivf_pq.
+        :param hnsw_m: Links per node for hnsw.
+        :param nprobe: IVF clusters searched per query. Higher is more accurate and slower.
+        :param ef_search: HNSW search breadth. Higher is more accurate and slower.
+        :param metric: "l2" (scores are 1 / (1 + distance)) or "cosine" (inner product over L2-normalized
+                       embeddings; scores are cosine similarities in [-1, 1], comparable across queries).
+        :param embedding_cache_dir: Folder of the persistent embedding cache (see models/embedding_cache.py),
+                                    so texts embedded before are read back instead of re-encoded. None disables it.
+        """
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.num_processes = num_processes
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
         self.faiss_index = None
-        self.lookup = []
+        self.lookup = []  # Index row → identifier. In chunked mode, several rows (chunks) map to the same section
+        self.lookup_rows = None  # Index row → position of its section in the U.S. Code store (None if not applicable)
+        self.chunked = False
+        self.manifest = None  # U.S. Code only: section ID → {"hash": content hash, "ids": its index rows}
         self.index_path = None  # Path for saving/loading FAISS index
 
+        self.index_type = index_type
+        self.build_params = {"nlist": nlist, "pq_m": pq_m, "hnsw_m": hnsw_m}
+        self.index_params = {"index_type": "flat", "metric": metric}  # Settings of the currently loaded/built index
+        self.nprobe = nprobe
+        self.ef_search = ef_search
+        self.metric = metric
+        self.embedding_cache = get_embedding_cache(embedding_cache_dir, model_name) if embedding_cache_dir else None
+
+    @property
+    def embedding_model(self):
+        """The shared SentenceTransformer for model_name, loaded lazily the first time something is embedded."""
+        return get_embedder(self.model_name)
+
     def create_embedding(self, text):
         """Generate text embeddings using Sentence Transformers."""
-        return self.embedding_model.encode(text, convert_to_numpy=True)
+        if self.embedding_cache is not None:
+            cached = self.embedding_cache.get(text)
+            if cached is not None:
+                return cached
+
+        embedding = self.embedding_model.encode(text, convert_to_numpy=True)
+        if self.embedding_cache is not None:
+            self.embedding_cache.put(text, embedding)
+        return embedding
+
+    def create_embeddings(self, texts, show_progress=True):
+        """
+        Generate embeddings for many texts at once.
+
+        Texts found in the embedding cache are read back from it. The rest are sorted by length and encoded
+        in batches of `batch_size`, so each batch holds texts of similar length and little compute is wasted
+        on padding, then written to the cache. Results are returned in the original order.
+
+        :param texts: List of strings.
+        :param show_progress: Print progress every few batches.
+        :return: float32 array of shape (len(texts), dimension).
+        """
+        if not texts:
+            return np.zeros((0, self.embedding_model.get_sentence_embedding_dimension()), dtype="float32")
 
-    def create_faiss_index_for_us_code(self, us_code_data, index_path="faiss_indexes/faiss_us_code.index"):
+        if self.embedding_cache is None:
+            return self._encode_texts(texts, show_progress)
+
+        cached = self.embedding_cache.get_many(texts)
+        # Encode each distinct uncached text once
+        missing_texts = list(dict.fromkeys(text for text, vector in zip(texts, cached) if vector is None))
+        if show_progress and len(texts) > 1:
+            print(f"  🔹 {len(texts) - sum(vector is None for vector in cached)}/{len(texts)} embeddings found in the cache.")
+
+        if missing_texts:
+            new_embeddings = self._encode_texts(missing_texts, show_progress)
+            self.embedding_cache.put_many(missing_texts, new_embeddings)
+            new_vectors = dict(zip(missing_texts, new_embeddings))
+            cached = [vector if vector is not None else new_vectors[text] for text, vector in zip(texts, cached)]
+
+        return np.array(cached, dtype="float32")
+
+    def _encode_texts(self, texts, show_progress=True):
+        """Encodes texts with the model, in length-sorted batches or on the multi-process pool."""
+        if self.num_processes and self.num_processes > 1:
+            return self._create_embeddings_multi_process(texts)
+
+        # Longest first, so a batch that runs out of memory fails right away rather than at the end
+        sorted_order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+        embeddings = None
+
+        for start in range(0, len(sorted_order), self.batch_size):
+            batch_indices = sorted_order[start:start + self.batch_size]
+            batch_embeddings = self.embedding_model.encode(
+                [texts[i] for i in batch_indices], batch_size=self.batch_size, convert_to_numpy=True
+            ).astype("float32")
+
+            if embeddings is None:
+                embeddings = np.zeros((len(texts), batch_embeddings.shape[1]), dtype="float32")
+            embeddings[batch_indices] = batch_embeddings
+
+            batch_number = start // self.batch_size + 1
+            if show_progress and batch_number % 20 == 0:
+                print(f"  🔹 Embedded {min(start + self.batch_size, len(texts))}/{len(texts)} texts...")
+
+        return embeddings
+
+    def chunk_text(self, text):
+        """
+        Splits text into overlapping windows of `chunk_size` words (sliding by chunk_size - chunk_overlap),
+        so long sections and bills are embedded in full instead of being truncated by the model.
+        """
+        words = text.split()
+        if len(words) <= self.chunk_size:
+            return [" ".join(words)] if words else []
+
+        stride = max(self.chunk_size - self.chunk_overlap, 1)
+        chunks = []
+        for start in range(0, len(words), stride):
+            chunks.append(" ".join(words[start:start + self.chunk_size]))
+            if start + self.chunk_size >= len(words):
+                break
+
+        return chunks
+
+    def _create_embeddings_multi_process(self, texts):
+        """Encodes texts on a pool of CPU worker processes (Sentence Transformers multi-process pool)."""
+        print(f"🔄 Embedding {len(texts)} texts on {self.num_processes} CPU processes...")
+        pool = self.embedding_model.start_multi_process_pool(target_devices=["cpu"] * self.num_processes)
+        try:
+            # encode_multi_process splits the input into chunks per worker and length-sorts within each batch
+            embeddings = self.embedding_model.encode_multi_process(texts, pool, batch_size=self.batch_size)
+        finally:
+            self.embedding_model.stop_multi_process_pool(pool)
+
+        return np.asarray(embeddings, dtype="float32")
+
+    def create_faiss_index_for_us_code(self, us_code_data, index_path="faiss_indexes/faiss_us_code.index", chunked=False):
         """
         Creates and saves a FAISS index specifically for U.S. Code data.
 
         :param us_code_data: Dictionary where each key is a section ID, and the value contains a "content" field.
         :param index_path: Path to save the FAISS index.
+        :param chunked: If True, index one vector per overlapping chunk of each section instead of one per section.
+                        The lookup then maps each chunk row to its section ID.
         """
         self.index_path = Path(index_path)
 
@@ -33,32 +275,128 @@ class EmbeddingFAISSManager:
             self.load_faiss_index(index_path)
             return
 
+        self.build_us_code_index(us_code_data, chunked)
+
+    def build_us_code_index(self, us_code_data, chunked=False):
+        """Embeds every section of us_code_data and saves a new U.S. Code index (and its manifest) to self.index_path."""
         print(f"Creating FAISS index for U.S. Code at {self.index_path}...")
 
-        embeddings = []
+        texts = []
         self.lookup = []
+        self.lookup_rows = []
+        self.manifest = {}
 
-        for i, (section_id, details) in enumerate(us_code_data.items(), start=1):  
-            if "content" in details and isinstance(details["content"], str):
-                text = details["content"]
-                embeddings.append(self.create_embedding(text).astype("float32"))
-                self.lookup.append(section_id)
-
-                if i % 50 == 0:  # ✅ Now using `i`, which is an integer
-                    print(f"  🔹 Processed {i}/{len(us_code_data)} sections...")
+        self.chunked = chunked
 
-        if not embeddings:
+        for row, (section_id, details) in enumerate(us_code_data.items()):
+            if "content" in details and isinstance(details["content"], str):
+                section_texts = self.chunk_text(details["content"]) if chunked else [details["content"]]
+                self.manifest[section_id] = {
+                    "hash": content_hash(details["content"]),
+                    "ids": list(range(len(texts), len(texts) + len(section_texts)))
+                }
+                texts.extend(section_texts)
+                self.lookup.extend([section_id] * len(section_texts))
+                self.lookup_rows.extend([row] * len(section_texts))
+
+        if not texts:
             raise ValueError("No valid 'content' found in U.S. Code data.")
 
+        print(f"  🔹 Embedding {len(texts)} {'chunks' if chunked else 'sections'} in batches of {self.batch_size}...")
+        embeddings = self.create_embeddings(texts)
 
-        # Create FAISS index
-        dimension = embeddings[0].shape[0]
-        self.faiss_index = faiss.IndexFlatL2(dimension)
-        self.faiss_index.add(np.array(embeddings))
+        # Create FAISS index, with ids so update_faiss_index_for_us_code can replace single sections later
+        if self.metric == "cosine":
+            embeddings = normalize_embeddings(embeddings)
+        self.faiss_index, self.index_params = build_faiss_index(
+            embeddings, self.index_type, metric=self.metric, with_ids=True, **self.build_params
+        )
+        set_search_params(self.faiss_index, self.nprobe, self.ef_search)
 
         # Save FAISS index and lookup
         self.save_faiss_index()
-        print(f"AISS index for U.S. Code created and saved.")
+        print(f"FAISS index for U.S. Code created and saved.")
+
+    def update_faiss_index_for_us_code(self, us_code_data, index_path="faiss_indexes/faiss_us_code.index", chunked=False):
+        """
+        Brings an existing U.S. Code index in line with us_code_data, re-embedding only the sections whose
+        content hash is new or changed and removing the vectors of changed or deleted sections.
+
+        Removed rows keep their place in the lookup as "" (ids must stay equal to lookup positions), so the
+        lookup grows a little with every update until the next full rebuild.
+        Falls back to a full rebuild if there is no index yet, it was saved without a manifest, or its
+        type can't remove vectors (HNSW).
+
+        :param chunked: Only used when a new index has to be built; updates keep the existing index's mode.
+        :return: Dict with the number of "added", "changed", "removed" and "unchanged" sections.
+        """
+        self.index_path = Path(index_path)
+        manifest_path = self.index_path.with_suffix(".manifest.json")
+
+        if not self.index_path.exists():
+            self.build_us_code_index(us_code_data, chunked)
+            return {"added": len(self.manifest), "changed": 0, "removed": 0, "unchanged": 0}
+
+        # Updates rewrite the index, so read it into memory rather than memory-mapping it
+        self.load_faiss_index(index_path, mmap=False)
+        if not manifest_path.exists() or not supports_updates(self.faiss_index):
+            print(f"⚠️ {self.index_path} can't be updated in place (no manifest or {self.index_params['index_type']} index). Rebuilding...")
+            self.index_type = self.index_params["index_type"]
+            self.build_params.update({key: self.index_params[key] for key in ("pq_m", "hnsw_m") if key in self.index_params})
+            self.build_us_code_index(us_code_data, self.chunked)
+            return {"added": len(self.manifest), "changed": 0, "removed": 0, "unchanged": 0}
+
+        new_hashes = {
+            section_id: content_hash(details["content"]) for section_id, details in us_code_data.items()
+            if "content" in details and isinstance(details["content"], str)
+        }
+        removed = [section_id for section_id in self.manifest if section_id not in new_hashes]
+        changed = [
+            section_id for section_id, section_hash in new_hashes.items()
+            if section_id in self.manifest and self.manifest[section_id]["hash"] != section_hash
+        ]
+        added = [section_id for section_id in new_hashes if section_id not in self.manifest]
+        counts = {
+            "added": len(added), "changed": len(changed), "removed": len(removed),
+            "unchanged": len(new_hashes) - len(added) - len(changed)
+        }
+
+        if not (added or changed or removed):
+            print(f"✅ FAISS index at {self.index_path} is up to date ({counts['unchanged']} sections).")
+            return counts
+
+        self.lookup = list(self.lookup)
+
+        # Drop the vectors of changed and removed sections
+        stale_ids = [index_id for section_id in removed + changed for index_id in self.manifest.pop(section_id)["ids"]]
+        if stale_ids:
+            self.faiss_index.remove_ids(np.array(stale_ids, dtype="int64"))
+            for index_id in stale_ids:
+                self.lookup[index_id] = ""
+
+        # Embed changed and added sections under fresh ids at the end of the lookup
+        texts = []
+        for section_id in changed + added:
+            content = us_code_data[section_id]["content"]
+            section_texts = self.chunk_text(content) if self.chunked else [content]
+            start_id = len(self.lookup)
+            self.manifest[section_id] = {"hash": new_hashes[section_id], "ids": list(range(start_id, start_id + len(section_texts)))}
+            self.lookup.extend([section_id] * len(section_texts))
+            texts.extend(section_texts)
+
+        if texts:
+            print(f"  🔹 Embedding {len(texts)} {'chunks' if self.chunked else 'sections'} in batches of {self.batch_size}...")
+            embeddings = self.prepare_queries(self.create_embeddings(texts))
+            self.faiss_index.add_with_ids(embeddings, np.arange(len(self.lookup) - len(texts), len(self.lookup), dtype="int64"))
+
+        # Section positions shift when sections are added or removed, so recompute them all
+        positions = {section_id: row for row, section_id in enumerate(us_code_data)}
+        self.lookup_rows = [positions.get(section_id, -1) for section_id in self.lookup]
+
+        self.save_faiss_index()
+        print(f"FAISS index for U.S. Code updated: {counts['added']} added, {counts['changed']} changed, "
+              f"{counts['removed']} removed, {counts['unchanged']} unchanged.")
+        return counts
 
     def create_faiss_index_for_demographics(self, demographic_data, index_path="faiss_indexes/faiss_demographics.index"):
         """
@@ -77,23 +415,32 @@ class EmbeddingFAISSManager:
 
         print(f"🔄 Creating FAISS index for Demographics at {self.index_path}...")
 
-        embeddings = []
+        all_terms = []
+        group_term_ranges = []
         self.lookup = []
+        self.lookup_rows = None
+        self.manifest = None
+        self.chunked = False
 
         for category, subcategories in demographic_data.items():
             for group, related_terms in subcategories.items():
                 if isinstance(related_terms, list) and len(related_terms) > 0:
-                    avg_embedding = np.mean([self.create_embedding(term) for term in related_terms], axis=0)
-                    embeddings.append(avg_embedding)
+                    group_term_ranges.append((len(all_terms), len(all_terms) + len(related_terms)))
+                    all_terms.extend(related_terms)
                     self.lookup.append(f"{category} - {group}")  # Example: "Race - White"
 
-        if not embeddings:
+        if not all_terms:
             raise ValueError("No valid demographic terms found in demographic data.")
 
+        # Embed every related term in one batched pass, then average each group's terms
+        term_embeddings = self.create_embeddings(all_terms)
+        embeddings = np.array([term_embeddings[start:end].mean(axis=0) for start, end in group_term_ranges], dtype="float32")
+
         # Create FAISS index
-        dimension = embeddings[0].shape[0]
-        self.faiss_index = faiss.IndexFlatL2(dimension)
-        self.faiss_index.add(np.array(embeddings))
+        # Only ~60 groups, so exact search is always the right choice here
+        if self.metric == "cosine":
+            embeddings = normalize_embeddings(embeddings)
+        self.faiss_index, self.index_params = build_faiss_index(embeddings, "flat", metric=self.metric)
 
         # Save FAISS index and lookup
         self.save_faiss_index()
@@ -105,36 +452,137 @@ class EmbeddingFAISSManager:
             self.index_path.parent.mkdir(parents=True, exist_ok=True)
             faiss.write_index(self.faiss_index, str(self.index_path))
 
-            # Save lookup list
-            lookup_path = self.index_path.with_suffix(".json")
-            with open(lookup_path, "w", encoding="utf-8") as f:
-                json.dump(self.lookup, f, indent=4)
+            # Save lookup as a compact, memory-mappable sidecar (replaces the old indented JSON list)
+            CompactLookup.save(self.index_path, list(self.lookup), self.lookup_rows)
+
+            # Save index settings that searches need to know about
+            with open(self.index_path.with_suffix(".params.json"), "w", encoding="utf-8") as f:
+                json.dump({
+                    **self.index_params,
+                    "nprobe": self.nprobe,
+                    "ef_search": self.ef_search,
+                    "chunked": self.chunked,
+                    "chunk_size": self.chunk_size,
+                    "chunk_overlap": self.chunk_overlap
+                }, f, indent=4)
+
+            if self.manifest is not None:
+                with open(self.index_path.with_suffix(".manifest.json"), "w", encoding="utf-8") as f:
+                    json.dump(self.manifest, f)
 
             print(f"FAISS index and lookup saved to {self.index_path}")
 
-    def load_faiss_index(self, index_path):
-        """Loads FAISS index from a file."""
+    def load_faiss_index(self, index_path, mmap=False):
+        """
+        Loads FAISS index from a file.
+
+        :param mmap: Memory-map the index and lookup instead of reading them into private memory, so
+                     several worker processes share one copy through the page cache. The index is then read-only.
+        """
         self.index_path = Path(index_path)
 
         if self.index_path.exists():
-            self.faiss_index = faiss.read_index(str(self.index_path))
-            lookup_path = self.index_path.with_suffix(".json")
-
-            if lookup_path.exists():
-                with open(lookup_path, "r", encoding="utf-8") as f:
-                    self.lookup = json.load(f)
+            self.faiss_index = self.read_faiss_index(self.index_path, mmap)
+
+            if CompactLookup.exists(self.index_path):
+                self.lookup = CompactLookup.load(self.index_path, mmap=mmap)
+                self.lookup_rows = self.lookup.rows
+            else:
+                # Indexes saved before the compact sidecar existed
+                lookup_path = self.index_path.with_suffix(".json")
+                if lookup_path.exists():
+                    with open(lookup_path, "r", encoding="utf-8") as f:
+                        self.lookup = json.load(f)
+                self.lookup_rows = None
+
+            self.manifest = None
+            manifest_path = self.index_path.with_suffix(".manifest.json")
+            if manifest_path.exists():
+                with open(manifest_path, "r", encoding="utf-8") as f:
+                    self.manifest = json.load(f)
+
+            self.chunked = False
+            self.index_params = {"index_type": "flat", "metric": "l2"}
+            params_path = self.index_path.with_suffix(".params.json")
+            if params_path.exists():
+                with open(params_path, "r", encoding="utf-8") as f:
+                    params = json.load(f)
+                self.chunked = params.get("chunked", False)
+                self.chunk_size = params.get("chunk_size", self.chunk_size)
+                self.chunk_overlap = params.get("chunk_overlap", self.chunk_overlap)
+                self.nprobe = params.get("nprobe", self.nprobe)
+                self.ef_search = params.get("ef_search", self.ef_search)
+                self.index_params = {
+                    key: params[key] for key in ("index_type", "metric", "nlist", "pq_m", "hnsw_m") if key in params
+                }
+            self.metric = self.index_params.get("metric", "l2")
+
+            set_search_params(self.faiss_index, self.nprobe, self.ef_search)
 
             print(f"FAISS index loaded from {self.index_path}")
         else:
             raise FileNotFoundError(f"FAISS index not found at {self.index_path}")
 
-    def search_faiss(self, query_text, top_k=3):
-        """Finds the most relevant matches from the FAISS index."""
+    @staticmethod
+    def read_faiss_index(index_path, mmap=False, index_type=None):
+        """
+        Reads a FAISS index, optionally memory-mapped. The flag depends on the index type (read from
+        <index>.params.json unless given): IVF indexes use IO_FLAG_MMAP, which maps their inverted lists
+        (IO_FLAG_MMAP_IFC would load them into memory), while flat and HNSW indexes use IO_FLAG_MMAP_IFC
+        (newer FAISS releases), which maps vector storage. If that flag can't be used, the index is read normally.
+        """
+        if mmap:
+            if index_type is None:
+                params_path = Path(index_path).with_suffix(".params.json")
+                index_type = "flat"
+                if params_path.exists():
+                    with open(params_path, "r", encoding="utf-8") as f:
+                        index_type = json.load(f).get("index_type", "flat")
+
+            if index_type.startswith("ivf"):
+                io_flag = faiss.IO_FLAG_MMAP
+            else:
+                io_flag = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP)
+
+            try:
+                return faiss.read_index(str(index_path), io_flag)
+            except RuntimeError as e:
+                print(f"⚠️ Could not memory-map {index_path} ({e}), reading it into memory instead.")
+
+        return faiss.read_index(str(index_path))
+
+    def prepare_queries(self, query_embeddings):
+        """Casts query embeddings to float32, normalizing them for cosine indexes."""
+        if self.metric == "cosine":
+            return normalize_embeddings(query_embeddings)
+        return np.ascontiguousarray(query_embeddings, dtype="float32")
+
+    def distance_to_score(self, distance):
+        """
+        Converts a FAISS distance into a similarity score. Cosine indexes already return cosine similarity
+        (clipped to [-1, 1] against float error); L2 indexes keep the original 1 / (1 + distance).
+        """
+        if self.metric == "cosine":
+            return float(min(max(distance, -1.0), 1.0))
+        return float(1 / (1 + distance))
+
+    def store_row(self, index):
+        """Position of an index row's section in the U.S. Code store, or -1 if the index doesn't record one."""
+        if self.lookup_rows is None:
+            return -1
+        return int(self.lookup_rows[index])
+
+    def search_faiss(self, query_text, top_k=3, with_rows=False):
+        """
+        Finds the most relevant matches from the FAISS index.
+
+        :param with_rows: Return (identifier, score, store_row) instead of (identifier, score), see store_row.
+        """
         if self.faiss_index is None:
             raise ValueError("FAISS index is not initialized.")
 
-        query_embedding = self.create_embedding(query_text).astype("float32")
-        distances, indices = self.faiss_index.search(np.array([query_embedding]), top_k)
+        query_embedding = self.prepare_queries(np.array([self.create_embedding(query_text)]))
+        distances, indices = self.faiss_index.search(query_embedding, top_k)
 
         results = []
         for i, index in enumerate(indices[0]):
@@ -142,26 +590,152 @@ class EmbeddingFAISSManager:
                 continue
 
             identifier = self.lookup[index]
-            similarity_score = 1 / (1 + distances[0][i])
-            results.append((identifier, similarity_score))
+            similarity_score = self.distance_to_score(distances[0][i])
+            result = (identifier, similarity_score)
+            results.append(result + (self.store_row(index),) if with_rows else result)
 
         return sorted(results, key=lambda x: x[1], reverse=True)
 
 
+    def search_faiss_batch(self, query_texts, top_k=3, with_rows=False):
+        """
+        Batch version of search_faiss: embeds all queries in one batched encode and runs a single
+        FAISS search over the (N, d) query matrix.
+
+        :return: One list of (identifier, score) per query (with with_rows, (identifier, score, store_row)),
+                 in the same order as query_texts.
+        """
+        if self.faiss_index is None:
+            raise ValueError("FAISS index is not initialized.")
+        if not query_texts:
+            return []
+
+        query_embeddings = self.prepare_queries(self.create_embeddings(list(query_texts), show_progress=False))
+        distances, indices = self.faiss_index.search(query_embeddings, top_k)
+
+        all_results = []
+        for query_distances, query_indices in zip(distances, indices):
+            results = []
+            for distance, index in zip(query_distances, query_indices):
+                if index < 0 or index >= len(self.lookup):
+                    continue
+                result = (self.lookup[index], self.distance_to_score(distance))
+                results.append(result + (self.store_row(index),) if with_rows else result)
+            all_results.append(sorted(results, key=lambda x: x[1], reverse=True))
+
+        return all_results
+
+    def search_faiss_chunked(self, query_text, top_k=3, aggregate="max", query_batch_size=256, with_rows=False):
+        """
+        Chunked search: splits the query into the same overlapping chunks used for indexing, searches
+        every query chunk, and scores each identifier by aggregating over the query's chunks.
+
+        For each query chunk, an identifier's score is its best-matching indexed chunk. Those per-chunk
+        scores are then combined with "max" (best single passage match) or "mean" (average over the whole
+        query, counting chunks where the identifier wasn't retrieved as 0).
+        Query chunks are embedded and searched `query_batch_size` at a time, so very long bills stay tractable.
+        """
+        return self.search_faiss_chunked_batch([query_text], top_k, aggregate, query_batch_size, with_rows)[0]
+
+    def search_faiss_chunked_batch(self, query_texts, top_k=3, aggregate="max", query_batch_size=256, with_rows=False):
+        """
+        Batch version of search_faiss_chunked. The chunks of all queries are embedded and searched together,
+        `query_batch_size` chunks at a time, and scores are aggregated per query.
+
+        :return: One list of (identifier, score) per query (with with_rows, (identifier, score, store_row)),
+                 in the same order as query_texts.
+        """
+        if self.faiss_index is None:
+            raise ValueError("FAISS index is not initialized.")
+        if aggregate not in ("max", "mean"):
+            raise ValueError(f"Unknown aggregate '{aggregate}', expected 'max' or 'mean'.")
+
+        # Flatten every query's chunks, remembering which query each chunk came from
+        all_chunks = []
+        chunk_owners = []
+        chunk_counts = []
+        for query_number, query_text in enumerate(query_texts):
+            query_chunks = self.chunk_text(query_text)
+            all_chunks.extend(query_chunks)
+            chunk_owners.extend([query_number] * len(query_chunks))
+            chunk_counts.append(len(query_chunks))
+
+        best_scores = [{} for _ in query_texts]
+        score_sums = [{} for _ in query_texts]
+        store_rows = {}  # identifier → store row; every chunk of a section has the same one
+
+        # Retrieve extra neighbors per chunk, since several indexed chunks can belong to the same section
+        search_k = min(top_k * 4 if self.chunked else top_k, self.faiss_index.ntotal)
+
+        for start in range(0, len(all_chunks), query_batch_size):
+            chunk_embeddings = self.prepare_queries(
+                self.create_embeddings(all_chunks[start:start + query_batch_size], show_progress=False)
+            )
+            distances, indices = self.faiss_index.search(chunk_embeddings, search_k)
+
+            for owner, chunk_distances, chunk_indices in zip(chunk_owners[start:start + query_batch_size], distances, indices):
+                chunk_scores = {}
+                for distance, index in zip(chunk_distances, chunk_indices):
+                    if index < 0 or index >= len(self.lookup):
+                        continue
+                    identifier = self.lookup[index]
+                    score = self.distance_to_score(distance)
+                    chunk_scores[identifier] = max(chunk_scores.get(identifier, score), score)
+                    store_rows.setdefault(identifier, self.store_row(index))
+
+                for identifier, score in chunk_scores.items():
+                    best_scores[owner][identifier] = max(best_scores[owner].get(identifier, score), score)
+                    score_sums[owner][identifier] = score_sums[owner].get(identifier, 0.0) + score
+
+        all_results = []
+        for query_number, chunk_count in enumerate(chunk_counts):
+            if aggregate == "max":
+                results = best_scores[query_number].items()
+            else:
+                results = [(identifier, total / chunk_count) for identifier, total in score_sums[query_number].items()]
+            results = sorted(results, key=lambda x: x[1], reverse=True)[:top_k]
+            if with_rows:
+                results = [(identifier, score, store_rows[identifier]) for identifier, score in results]
+            all_results.append(results)
+
+        return all_results
+
 
 # ----------------------------
 # **Create the embeddings, then FAISS indexes for demographics data dict and U.S. code sections **
 # ----------------------------
 
 if __name__ == "__main__":
-    # Load U.S. Code Data
+    parser = argparse.ArgumentParser(description="Create FAISS indexes for U.S. Code sections and demographics.")
+    parser.add_argument("--batch-size", type=int, default=64, help="Texts per embedding batch.")
+    parser.add_argument("--processes", type=int, default=0, help="CPU worker processes for embedding (0 = in-process).")
+    parser.add_argument("--chunked", action="store_true", help="Index overlapping chunks of each U.S. Code section.")
+    parser.add_argument("--index-type", choices=INDEX_TYPES, default="flat", help="FAISS index type for the U.S. Code index.")
+    parser.add_argument("--nlist", type=int, default=None, help="IVF clusters (default ~4 * sqrt(N)).")
+    parser.add_argument("--nprobe", type=int, default=16, help="IVF clusters searched per query.")
+    parser.add_argument("--ef-search", type=int, default=64, help="HNSW search breadth.")
+    parser.add_argument("--metric", choices=METRICS, default="l2", help="l2 distance or cosine similarity (inner product).")
+    parser.add_argument("--no-embedding-cache", action="store_true", help="Re-embed every text instead of using the embedding cache.")
+    parser.add_argument("--update", action="store_true",
+                        help="Update an existing U.S. Code index in place, re-embedding only added or changed sections.")
+    args = parser.parse_args()
+
+    # Load U.S. Code Data (from the section store, so the whole JSON isn't held in memory while embedding)
+    from utils.us_code_store import USCodeStore
+
     us_code_path = "data_output/processed_uscode_sections.json"
-    with open(us_code_path, "r", encoding="utf-8") as f:
-        us_code_data = json.load(f)
+    us_code_data = USCodeStore.load_or_build(us_code_path)
 
     # Create FAISS index for U.S. Code
-    manager = EmbeddingFAISSManager()
-    manager.create_faiss_index_for_us_code(us_code_data, "faiss_indexes/faiss_us_code.index")
+    manager = EmbeddingFAISSManager(
+        batch_size=args.batch_size, num_processes=args.processes, index_type=args.index_type,
+        nlist=args.nlist, nprobe=args.nprobe, ef_search=args.ef_search, metric=args.metric,
+        embedding_cache_dir=None if args.no_embedding_cache else "data_output/embedding_cache"
+    )
+    if args.update:
+        manager.update_faiss_index_for_us_code(us_code_data, "faiss_indexes/faiss_us_code.index", chunked=args.chunked)
+    else:
+        manager.create_faiss_index_for_us_code(us_code_data, "faiss_indexes/faiss_us_code.index", chunked=args.chunked)
 
     demographic_path = "data/demographic_data.json"
     with open(demographic_path, "r", encoding="utf-8") as f:
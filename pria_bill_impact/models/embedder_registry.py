@@ -0,0 +1,23 @@
+import threading
+
+
+# One SentenceTransformer per model name, shared by every EmbeddingFAISSManager in the process
+_embedders = {}
+_lock = threading.Lock()
+
+
+def get_embedder(model_name="sentence-transformers/all-MiniLM-L12-v2"):
+    """
+    Returns the process-wide SentenceTransformer for model_name, loading it on first use.
+
+    sentence_transformers (and torch) are only imported here, so code paths that never embed
+    anything, like direct-mapping or cache-only analyzer runs, start without loading them at all.
+    """
+    with _lock:
+        if model_name not in _embedders:
+            from sentence_transformers import SentenceTransformer
+
+            print(f"🔄 Loading embedding model {model_name}...")
+            _embedders[model_name] = SentenceTransformer(model_name)
+
+        return _embedders[model_name]
@@ -0,0 +1,189 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+
+class EmbeddingCache:
+    """
+    Persistent store of embeddings for one model, keyed by a sha256 of the embedded text, so bill
+    texts, demographic terms and unchanged U.S. Code sections aren't re-embedded on every run.
+
+    Vectors are appended to a raw float32 matrix file that is memory-mapped for reads, and a SQLite
+    offset table maps each text hash to its row. The most recently used vectors are also kept in an
+    in-memory LRU of at most `memory_items` entries.
+
+    Files for model "sentence-transformers/all-MiniLM-L12-v2" in cache_dir:
+        sentence-transformers_all-MiniLM-L12-v2.vectors.f32, sentence-transformers_all-MiniLM-L12-v2.offsets.sqlite
+    """
+
+    def __init__(self, cache_dir="data_output/embedding_cache", model_name="sentence-transformers/all-MiniLM-L12-v2",
+                 memory_items=10000):
+        """
+        Args:
+            cache_dir (str | Path): Folder holding the vector and offset files.
+            model_name (str): Embedding model the vectors come from. Each model gets its own files.
+            memory_items (int): Max vectors kept in the in-memory LRU tier.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.model_name = model_name
+        self.memory_items = memory_items
+
+        file_stem = re.sub(r"[^\w.-]+", "_", model_name)
+        self.vectors_path = self.cache_dir / f"{file_stem}.vectors.f32"
+        self.offsets_path = self.cache_dir / f"{file_stem}.offsets.sqlite"
+
+        self.memory = OrderedDict()  # text hash → vector, least recently used first
+        self.vectors = None  # Memory map over the rows of vectors_path known so far
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.vectors_path.touch(exist_ok=True)
+        self.conn = sqlite3.connect(str(self.offsets_path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS offsets (text_hash TEXT PRIMARY KEY, row INTEGER)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.conn.commit()
+
+        self.dimension = None
+        self._load_dimension()
+
+    @staticmethod
+    def text_hash(text):
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get_many(self, texts):
+        """Returns a list with the cached vector for each text, or None where it isn't cached."""
+        hashes = [self.text_hash(text) for text in texts]
+        results = [None] * len(texts)
+
+        with self.lock:
+            missing = {}
+            for i, text_hash in enumerate(hashes):
+                if text_hash in self.memory:
+                    self.memory.move_to_end(text_hash)
+                    results[i] = self.memory[text_hash]
+                else:
+                    missing.setdefault(text_hash, []).append(i)
+
+            if missing:
+                rows = self._lookup_rows(list(missing))
+                if rows:
+                    vectors = self._vectors(max(rows.values()) + 1)
+                    for text_hash, row in rows.items():
+                        vector = np.array(vectors[row])
+                        self._remember(text_hash, vector)
+                        for i in missing[text_hash]:
+                            results[i] = vector
+
+            found = sum(result is not None for result in results)
+            self.hits += found
+            self.misses += len(texts) - found
+
+        return results
+
+    def put_many(self, texts, embeddings):
+        """Stores embeddings (one row per text). Texts that are already cached are skipped."""
+        embeddings = np.ascontiguousarray(embeddings, dtype="float32")
+        new_vectors = {}
+        for text, vector in zip(texts, embeddings):
+            new_vectors.setdefault(self.text_hash(text), vector)
+
+        with self.lock:
+            # BEGIN IMMEDIATE takes the write lock up front, so concurrent processes can't hand out the same rows
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self._load_dimension() is None:
+                    self.dimension = embeddings.shape[1]
+                    self.conn.execute("INSERT INTO meta VALUES ('dimension', ?)", (str(self.dimension),))
+                elif embeddings.shape[1] != self.dimension:
+                    raise ValueError(f"Embedding dimension {embeddings.shape[1]} doesn't match the cache's {self.dimension}.")
+
+                existing = self._lookup_rows(list(new_vectors))
+                to_write = [text_hash for text_hash in new_vectors if text_hash not in existing]
+
+                if to_write:
+                    next_row = self.conn.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM offsets").fetchone()[0]
+                    with open(self.vectors_path, "r+b") as f:
+                        f.seek(next_row * self.dimension * 4)
+                        f.write(np.stack([new_vectors[text_hash] for text_hash in to_write]).tobytes())
+                        f.flush()
+                        os.fsync(f.fileno())
+
+                    # Rows only become visible once their vectors are on disk
+                    self.conn.executemany(
+                        "INSERT INTO offsets VALUES (?, ?)",
+                        [(text_hash, next_row + i) for i, text_hash in enumerate(to_write)]
+                    )
+                self.conn.commit()
+            except BaseException:
+                self.conn.rollback()
+                raise
+
+            for text_hash, vector in new_vectors.items():
+                self._remember(text_hash, vector)
+
+    def get(self, text):
+        return self.get_many([text])[0]
+
+    def put(self, text, embedding):
+        self.put_many([text], np.asarray(embedding).reshape(1, -1))
+
+    def stats(self):
+        """Returns hit/miss counters and the number of vectors on disk."""
+        with self.lock:
+            entries = self.conn.execute("SELECT COUNT(*) FROM offsets").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "in_memory": len(self.memory)}
+
+    def _lookup_rows(self, hashes):
+        """Maps the given text hashes to their rows in the vector file (absent hashes are left out)."""
+        rows = {}
+        for start in range(0, len(hashes), 500):  # Stay under SQLite's bound-parameter limit
+            batch = hashes[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows.update(self.conn.execute(
+                f"SELECT text_hash, row FROM offsets WHERE text_hash IN ({placeholders})", batch
+            ).fetchall())
+        return rows
+
+    def _load_dimension(self):
+        """Reads the vector dimension, which is set by the first put (possibly in another process)."""
+        if self.dimension is None:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'dimension'").fetchone()
+            self.dimension = int(row[0]) if row else None
+        return self.dimension
+
+    def _vectors(self, min_rows):
+        """Memory map over the vector file, remapped when rows written since (possibly by another process) are needed."""
+        self._load_dimension()
+        if self.vectors is None or len(self.vectors) < min_rows:
+            num_rows = self.vectors_path.stat().st_size // (self.dimension * 4)
+            self.vectors = np.memmap(self.vectors_path, dtype="float32", mode="r", shape=(num_rows, self.dimension))
+        return self.vectors
+
+    def _remember(self, text_hash, vector):
+        self.memory[text_hash] = vector
+        self.memory.move_to_end(text_hash)
+        while len(self.memory) > self.memory_items:
+            self.memory.popitem(last=False)
+
+
+# One EmbeddingCache per (folder, model) in the process, shared like the embedding models themselves
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(cache_dir="data_output/embedding_cache", model_name="sentence-transformers/all-MiniLM-L12-v2"):
+    """Returns the process-wide EmbeddingCache for cache_dir and model_name, opening it on first use."""
+    key = (str(Path(cache_dir).resolve()), model_name)
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = EmbeddingCache(cache_dir, model_name)
+        return _caches[key]
@@ -1,23 +1,33 @@
 from models.embedder_and_faiss_indexer import EmbeddingFAISSManager
 
 class USCodeMatcher:
-    def __init__(self, us_code_data):
+    def __init__(self, us_code_data, mmap=True):
         """
         Initialize FAISS search for U.S. Code similarity.
         The FAISS index needs to be created before this, using embedder_and_faiss_indexer.
+
+        Args:
+            us_code_data (USCodeStore | dict): Processed U.S. Code sections. With a USCodeStore, hits are read
+                                               by their store position (see section_for_hit).
+            mmap (bool): Memory-map the index so parallel workers share it instead of each loading a copy.
         """
         print("🔄 Loading FAISS index for U.S. Code matching...")
         self.us_code_faiss = EmbeddingFAISSManager()
-        self.us_code_faiss.load_faiss_index("faiss_indexes/faiss_us_code.index")
+        self.us_code_faiss.load_faiss_index("faiss_indexes/faiss_us_code.index", mmap=mmap)
         self.us_code_data = us_code_data
 
-    def search_similar_sections(self, bill_text, top_k=3):
+    def search_similar_sections(self, bill_text, top_k=3, aggregate="max", min_score=None):
         """
         Finds the most similar U.S. Code sections for a given bill text using FAISS.
+        If the index was built in chunked mode, the bill is chunked the same way and section scores
+        are aggregated over the bill's chunks, so long bills are matched on their full text.
 
         Args:
             bill_text (str): The text of the bill.
             top_k (int): Number of closest U.S. Code sections to retrieve.
+            aggregate (str): "max" or "mean" over the bill's chunks (chunked indexes only).
+            min_score (float): Drop sections scoring below this, so weak matches never reach LLM summarization.
+                               Most meaningful with a cosine index, where scores are comparable across bills.
 
         Returns:
             List[Dict]: A list of dictionaries, each containing:
@@ -27,12 +37,54 @@ class USCodeMatcher:
         """
         print(f"🔍 Searching FAISS for similar U.S. Code sections...")
 
-        faiss_results = self.us_code_faiss.search_faiss(bill_text, top_k)
+        if self.us_code_faiss.chunked:
+            faiss_results = self.us_code_faiss.search_faiss_chunked(bill_text, top_k, aggregate=aggregate, with_rows=True)
+        else:
+            faiss_results = self.us_code_faiss.search_faiss(bill_text, top_k, with_rows=True)
+
+        results = self.build_section_results(faiss_results, min_score)
+
+        print(f"✅ Found {len(results)} similar U.S. Code sections via FAISS.")
+        return results
+
+    def search_similar_sections_batch(self, bill_texts, top_k=3, aggregate="max", min_score=None):
+        """
+        Batch version of search_similar_sections: all bills are embedded in one encode pass and searched
+        with one FAISS call, instead of one round trip per bill.
+
+        Returns:
+            List[List[Dict]]: One result list per bill, in the same order as bill_texts.
+        """
+        print(f"🔍 Searching FAISS for similar U.S. Code sections for {len(bill_texts)} bills...")
+
+        if self.us_code_faiss.chunked:
+            batch_results = self.us_code_faiss.search_faiss_chunked_batch(bill_texts, top_k, aggregate=aggregate, with_rows=True)
+        else:
+            batch_results = self.us_code_faiss.search_faiss_batch(bill_texts, top_k, with_rows=True)
+
+        return [self.build_section_results(faiss_results, min_score) for faiss_results in batch_results]
+
+    def section_for_hit(self, section_id, store_row):
+        """
+        Reads a FAISS hit's section by its position in the U.S. Code store, falling back to the lookup by
+        section ID when the index has no position for it (-1) or the store was rebuilt since the index was.
+        """
+        if store_row >= 0 and hasattr(self.us_code_data, "section_at"):
+            section = self.us_code_data.section_at(store_row)
+            if section and section["section_identifier_full"] == section_id:
+                return section
+
+        return self.us_code_data.get(section_id, {})
 
+    def build_section_results(self, faiss_results, min_score=None):
+        """Turns (section_id, score, store_row) FAISS results into the section dicts the analyzer uses."""
         results = []
 
-        for section_id, score in faiss_results:
-            us_code = self.us_code_data.get(section_id, {})
+        for section_id, score, store_row in faiss_results:
+            if min_score is not None and score < min_score:
+                continue
+
+            us_code = self.section_for_hit(section_id, store_row)
             title_number = us_code.get("title_number")
             section_number = us_code.get("section_number")
             us_code_text = us_code.get("content", "No original text available.")
@@ -46,6 +98,4 @@ class USCodeMatcher:
                 "match_type": "faiss_semantic_match"
             })
 
-        print(f"✅ Found {len(results)} similar U.S. Code sections via FAISS.")
         return results
-
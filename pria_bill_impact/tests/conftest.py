@@ -0,0 +1,41 @@
+import sys
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Modules import each other from the package folder (e.g. "from models.x import ..."), as when run from there
+PACKAGE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PACKAGE_DIR))
+
+from models import embedder_registry  # noqa: E402
+
+
+class BagOfWordsEmbedder:
+    """
+    Tiny deterministic stand-in for a SentenceTransformer: each word is hashed into one of `dimension`
+    buckets, so texts sharing words end up close. Lets tests build and search real FAISS indexes offline.
+    """
+
+    def __init__(self, dimension=64):
+        self.dimension = dimension
+
+    def get_sentence_embedding_dimension(self):
+        return self.dimension
+
+    def encode(self, texts, batch_size=None, convert_to_numpy=True, **kwargs):
+        single = isinstance(texts, str)
+        vectors = np.zeros((1 if single else len(texts), self.dimension), dtype="float32")
+        for row, text in enumerate([texts] if single else texts):
+            for word in text.lower().split():
+                vectors[row, zlib.crc32(word.encode("utf-8")) % self.dimension] += 1.0
+        return vectors[0] if single else vectors
+
+
+@pytest.fixture
+def bag_of_words_embedder(monkeypatch):
+    """Registers BagOfWordsEmbedder as the process-wide model for the default model name."""
+    embedder = BagOfWordsEmbedder()
+    monkeypatch.setitem(embedder_registry._embedders, "sentence-transformers/all-MiniLM-L12-v2", embedder)
+    return embedder
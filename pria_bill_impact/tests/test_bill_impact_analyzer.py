@@ -0,0 +1,121 @@
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from bill_analysis_pipeline import BillAnalysisPipeline
+from bill_impact_analyzer import BillTextAnalyzer
+from llm.anthropic_client import ClaudeLLM
+from llm.fake_anthropic_client import FakeAnthropicClient
+from models.embedder_and_faiss_indexer import EmbeddingFAISSManager
+from utils.us_code_store import USCodeStore
+
+PACKAGE_DIR = Path(__file__).resolve().parent.parent
+
+
+US_CODE_SECTIONS = {
+    "42 U.S.C. 1395": {
+        "title_number": "42", "title_name": "The Public Health and Welfare", "section_number": "1395",
+        "section_name": "Prohibition against any Federal interference",
+        "content": "Nothing in this subchapter shall be construed to authorize any Federal officer to supervise the practice of medicine"
+    },
+    "26 U.S.C. 25": {
+        "title_number": "26", "title_name": "Internal Revenue Code", "section_number": "25",
+        "section_name": "Interest on certain home mortgages",
+        "content": "There shall be allowed as a credit against the income tax the mortgage interest paid by a renter or homeowner"
+    },
+    "7 U.S.C. 2011": {
+        "title_number": "7", "title_name": "Agriculture", "section_number": "2011",
+        "section_name": "Congressional declaration of policy",
+        "content": "It is declared to be the policy of Congress to safeguard the health of the population through food assistance"
+    },
+}
+
+BILLS = {
+    "118_hr_1": {
+        "title": "Medicare Practice Act", "became_law": False,
+        "bill_text_raw": "A bill to amend section 1395 of the Social Security Act (42 U.S.C. 1395) on the practice of medicine."
+    },
+    "118_hr_2": {
+        "title": "Renter Tax Credit Act", "became_law": False,
+        "bill_text_raw": "A bill to allow a credit against the income tax for mortgage interest paid by a renter."
+    },
+    "118_hr_3": {
+        "title": "Food Assistance Act", "became_law": True, "public_law_number": "118-5",
+        "bill_text_raw": "An act to expand food assistance for low-income households."
+    },
+}
+
+PUBLIC_LAW_MAPPING = {"118-5": {"us_code_sections": [{"title": "7", "section": "2011"}]}}
+
+
+@pytest.fixture
+def analyzer(tmp_path, monkeypatch, bag_of_words_embedder):
+    """A BillTextAnalyzer over a tiny U.S. Code, bill set and FAISS indexes, with an offline fake Claude client."""
+    monkeypatch.chdir(tmp_path)
+    shutil.copytree(PACKAGE_DIR / "data", tmp_path / "data")
+
+    sections_path = tmp_path / "data_processing" / "data_output" / "processed_uscode_sections.json"
+    sections_path.parent.mkdir(parents=True)
+    sections_path.write_text(json.dumps({
+        section_key: {**section, "section_identifier_full": section_key} for section_key, section in US_CODE_SECTIONS.items()
+    }))
+    (tmp_path / "data_processing" / "data_output" / "bill_data_output.json").write_text(json.dumps(BILLS))
+    (tmp_path / "data_output").mkdir()
+    (tmp_path / "data_output" / "public_law_to_us_code_mapping.json").write_text(json.dumps(PUBLIC_LAW_MAPPING))
+
+    manager = EmbeddingFAISSManager(embedding_cache_dir=None)
+    manager.create_faiss_index_for_us_code(USCodeStore.load_or_build(sections_path))
+    with open("data/demographic_data.json", "r", encoding="utf-8") as f:
+        manager.create_faiss_index_for_demographics(json.load(f))
+
+    llm_client = ClaudeLLM(client=FakeAnthropicClient(), use_cache=False,
+                           requests_per_minute=10 ** 9, tokens_per_minute=10 ** 12)
+    yield BillTextAnalyzer(llm_client)
+    llm_client.close()
+
+
+def bill_items():
+    return [(bill_id, bill["bill_text_raw"]) for bill_id, bill in BILLS.items()]
+
+
+def check_results(results):
+    assert set(results) == set(BILLS)
+    expected_matches = {
+        "118_hr_1": ("42 U.S.C. 1395", "mentioned_in_bill_mapping"),
+        "118_hr_2": ("26 U.S.C. 25", "faiss_semantic_match"),
+        "118_hr_3": ("7 U.S.C. 2011", "passed_law_direct_mapping"),
+    }
+    for bill_id, (section_id, match_type) in expected_matches.items():
+        result = results[bill_id]
+        assert result["title"] == BILLS[bill_id]["title"]
+        assert result["legal_modifications"][0]["us_code_section"] == section_id
+        assert result["legal_modifications"][0]["match_type"] == match_type
+        assert result["legal_modifications"][0]["modification_summary"]["change_type"] == "Minor"
+        assert "Income - Low-Income" in result["matched_demographics"]
+
+
+def test_pipeline_writes_every_bill_result(analyzer, tmp_path):
+    stats = BillAnalysisPipeline(analyzer, retrieval_batch_size=2).run(bill_items())
+
+    assert (stats["write"]["items"], stats["write"]["failed"]) == (3, 0)
+    results = dict(analyzer.result_sink.items())
+    check_results(results)
+
+    analyzer.result_sink.export(tmp_path / "results.json")
+    with open(tmp_path / "results.json", "r", encoding="utf-8") as f:
+        assert json.load(f) == results
+
+
+def test_faiss_fallback_reads_the_matched_section_text(analyzer):
+    [sections] = analyzer.us_code_matcher.search_similar_sections_batch([BILLS["118_hr_2"]["bill_text_raw"]], top_k=1)
+
+    assert sections[0]["section_id"] == "26 U.S.C. 25"
+    assert sections[0]["us_code_text"] == US_CODE_SECTIONS["26 U.S.C. 25"]["content"]
+
+
+def test_batch_mode_matches_the_pipeline(analyzer):
+    analyzer.save_results(analyzer.analyze_bills_in_batch(bill_items(), poll_interval=0))
+
+    check_results(dict(analyzer.result_sink.items()))
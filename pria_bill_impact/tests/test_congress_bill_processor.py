@@ -0,0 +1,105 @@
+import pytest
+
+from data_processing import congress_bill_processor
+from data_processing.congress_bill_processor import CongressAPIClient
+from data_processing.mock_congress_server import run_mock_server
+
+
+@pytest.fixture
+def make_client(tmp_path, monkeypatch):
+    """
+    Builds CongressAPIClients whose checkpoints, bill store and text cache live in tmp_path. Each client
+    records every HTTP attempt it makes as (url, status code) in client.responses.
+    """
+    monkeypatch.setattr(congress_bill_processor, "CHECKPOINT_FILE", tmp_path / "listing_checkpoints.json")
+    clients = []
+
+    def make(base_url, bill_store_name="bill_data.jsonl", **kwargs):
+        bill_store_path = tmp_path / bill_store_name
+        bill_store_path.touch()  # An existing store doesn't import legacy bill files from the real output folder
+        client = CongressAPIClient("test-key", base_url=base_url, bill_store_path=bill_store_path,
+                                   text_cache_dir=tmp_path / "bill_text_cache", **kwargs)
+        clients.append(client)
+
+        client.responses = []
+        send = client.session.request
+
+        def record(method, url, **request_kwargs):
+            response = send(method, url, **request_kwargs)
+            client.responses.append((url, response.status_code))
+            return response
+
+        monkeypatch.setattr(client.session, "request", record)
+        return client
+
+    yield make
+    for client in clients:
+        client.close()
+
+
+def list_urls(client, bill_type):
+    return [url for url, _ in client.responses if f"/bill/118/{bill_type}?" in url]
+
+
+def test_sync_follows_pagination_and_only_refetches_updated_bills(make_client):
+    with run_mock_server(num_bills=12) as base_url:
+        client = make_client(base_url, offset_limit=4)
+        records, processed_bills = client.gather_bill_data(compact=False)
+
+        # 6 HR and 6 S bills, listed 4 per page
+        assert processed_bills == {f"118_{'hr' if i % 2 == 0 else 's'}_{i + 1}" for i in range(12)}
+        assert len(list_urls(client, "hr")) == 2 and "offset=4" in list_urls(client, "hr")[1]
+        assert records["118_hr_7"]["became_law"] and records["118_hr_7"]["public_law_number"] == "118-7"
+        assert "Section 8 of title 42" in records["118_s_2"]["bill_text_raw"]
+        assert set(client.checkpoints) == {"118_hr", "118_s"}
+        assert all(checkpoint["last_synced"] for checkpoint in client.checkpoints.values())
+
+        # Nothing was updated since, so the next sync only lists
+        client.responses.clear()
+        client.gather_bill_data(compact=False)
+        assert all("/bill/118/hr?" in url or "/bill/118/s?" in url for url, _ in client.responses)
+
+
+def test_interrupted_listing_resumes_from_its_checkpoint(make_client, monkeypatch):
+    with run_mock_server(num_bills=12) as base_url:
+        client = make_client(base_url, offset_limit=4)
+        make_request = client._make_request
+
+        def fail_second_page(method, url, **kwargs):
+            return None if "offset=4" in url else make_request(method, url, **kwargs)
+
+        monkeypatch.setattr(client, "_make_request", fail_second_page)
+        assert client.list_bills(118, "hr") is None
+
+        # A new client picks the listing up at the page that failed
+        resumed_client = make_client(base_url, offset_limit=4)
+        listed_bills = resumed_client.list_bills(118, "hr")
+
+        assert [bill_number for bill_number, _ in listed_bills] == ["1", "3", "5", "7", "9", "11"]
+        assert len(list_urls(resumed_client, "hr")) == 1 and "offset=4" in list_urls(resumed_client, "hr")[0]
+
+
+def test_rate_limited_requests_back_off_and_retry(make_client):
+    with run_mock_server(num_bills=2, rate_limit_every=3) as base_url:
+        client = make_client(base_url)
+        _, processed_bills = client.gather_bill_data(bill_types=("hr",), compact=False)
+
+        assert processed_bills == {"118_hr_1"}
+        assert any(status == 429 for _, status in client.responses)
+        assert client.rate_limiter.resume_at > 0
+
+
+def test_unchanged_bill_text_is_revalidated_with_its_etag(make_client):
+    with run_mock_server(num_bills=4) as base_url:
+        client = make_client(base_url)
+        client.gather_bill_data(compact=False)
+        assert client.text_cache.stats["downloaded"] == 4
+
+        # A fresh bill store refetches every bill, but the cached texts are only revalidated (full=True, as
+        # the checkpoints say everything is already synced)
+        refetch_client = make_client(base_url, bill_store_name="refetched_bill_data.jsonl")
+        records, _ = refetch_client.gather_bill_data(full=True, compact=False)
+
+        assert refetch_client.text_cache.stats == {"downloaded": 0, "not_modified": 4, "cached_only": 0}
+        assert sum(status == 304 for _, status in refetch_client.responses) == 4
+        assert records["118_hr_1"]["bill_text_raw"] == client.bill_store.records["118_hr_1"]["bill_text_raw"]
@@ -0,0 +1,89 @@
+import json
+from pathlib import Path
+
+from utils.file_utils import load_json
+
+
+def file_fingerprint(file_path):
+    """Returns [size, mtime_ns] for a file, or None if it doesn't exist."""
+    path = Path(file_path)
+    if not path.exists():
+        return None
+    stat = path.stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class BillUSCodeMappingCache:
+    """
+    Precomputed {bill_id: {"public_law_number": X, "us_code_sections": [...]}} mapping for bills
+    that became public law.
+
+    The mapping is built once and saved to disk together with fingerprints of the bill data and
+    public law mapping files it was computed from. It is only rebuilt when one of those files
+    changes. Newly fetched bills can be added with update_bills() without a full rebuild.
+    """
+
+    def __init__(self, cache_path, bills_path, public_law_mapping_path):
+        self.cache_path = Path(cache_path)
+        self.source_paths = [str(bills_path), str(public_law_mapping_path)]
+        self.mapping = {}
+
+    def current_fingerprints(self):
+        return {path: file_fingerprint(path) for path in self.source_paths}
+
+    def load(self):
+        """Loads the cached mapping. Returns False if it is missing or out of date."""
+        if not self.cache_path.exists():
+            return False
+
+        cached = load_json(self.cache_path)
+        if cached.get("sources") != self.current_fingerprints():
+            print("🔄 Bill data or public law mapping changed, bill → U.S. Code mapping is out of date.")
+            return False
+
+        self.mapping = cached.get("mapping", {})
+        return True
+
+    def save(self):
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.cache_path, "w", encoding="utf-8") as f:
+            json.dump({"sources": self.current_fingerprints(), "mapping": self.mapping}, f)
+
+    def build(self, bills, public_law_mapping):
+        """Builds the mapping from scratch in one pass over the bills."""
+        print(f"🔄 Building bill → U.S. Code mapping for {len(bills)} bills...")
+        self.mapping = {}
+        self.update_bills(bills, public_law_mapping, save=False)
+        self.save()
+        print(f"✅ Mapped {len(self.mapping)} passed bills to U.S. Code sections.")
+        return self.mapping
+
+    def load_or_build(self, bills, public_law_mapping):
+        if not self.load():
+            self.build(bills, public_law_mapping)
+        return self.mapping
+
+    def update_bills(self, new_bills, public_law_mapping, save=True):
+        """
+        Adds (or refreshes) the mapping for newly fetched bills only.
+
+        Args:
+            new_bills (dict): {bill_id: bill_data} for the bills to add.
+            public_law_mapping (dict): Public law → U.S. Code mapping.
+            save (bool): Whether to write the cache back to disk afterwards.
+        """
+        for bill_id, bill_data in new_bills.items():
+            public_law_number = bill_data.get("public_law_number")
+
+            if public_law_number and public_law_number in public_law_mapping:
+                self.mapping[bill_id] = {
+                    "public_law_number": public_law_number,
+                    "us_code_sections": public_law_mapping[public_law_number].get("us_code_sections", [])
+                }
+            else:
+                self.mapping.pop(bill_id, None)
+
+        if save:
+            self.save()
+
+        return self.mapping
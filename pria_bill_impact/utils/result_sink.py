@@ -0,0 +1,125 @@
+import json
+import os
+import threading
+from pathlib import Path
+
+
+class AnalysisResultSink:
+    """
+    Append-only JSON Lines log of bill analysis results, one {"bill_id": ..., "result": {...}} per
+    line, so saving a result costs one small write no matter how many came before it.
+
+    Each write is fsync'd, so a crash loses at most the bill being written; a torn last line is cut
+    off the next time the sink is opened, and a malformed line anywhere else is skipped. Only each
+    bill's latest line offset is kept in memory. A bill written again takes its latest result.
+    export() produces the legacy {bill_id: result} JSON (indent=4) by streaming over the log.
+    """
+
+    def __init__(self, sink_path, legacy_results_path=None):
+        """
+        Args:
+            sink_path (str | Path): The JSON Lines log.
+            legacy_results_path (str | Path): {bill_id: result} JSON imported when the log doesn't exist yet.
+        """
+        self.sink_path = Path(sink_path)
+        self.lock = threading.Lock()
+        self.offsets = {}  # bill_id → offset of its latest line, in order of first appearance
+
+        self.sink_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.sink_path.exists():
+            self._load()
+        else:
+            self._import_legacy(legacy_results_path)
+
+    def _load(self):
+        """
+        Indexes every complete line, skipping (and reporting) any that can't be decoded, and cuts off a
+        torn last line (one without its newline) so writes start on a clean line.
+        """
+        offset = 0
+        with open(self.sink_path, "rb") as f:
+            for line_number, line in enumerate(f, start=1):
+                if not line.endswith(b"\n"):
+                    break  # Only the last line can lack its newline
+                line_offset, offset = offset, offset + len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None
+                if not isinstance(record, dict) or "bill_id" not in record or "result" not in record:
+                    print(f"⚠️ Skipping malformed result on line {line_number} of {self.sink_path}")
+                    continue
+                self.offsets[record["bill_id"]] = line_offset
+
+        if offset < self.sink_path.stat().st_size:
+            print(f"⚠️ Dropping an incomplete result at the end of {self.sink_path}")
+            with open(self.sink_path, "r+b") as f:
+                f.truncate(offset)
+
+    def _import_legacy(self, legacy_results_path):
+        self.sink_path.touch()
+        if not legacy_results_path or not Path(legacy_results_path).exists():
+            return
+
+        with open(legacy_results_path, "r", encoding="utf-8") as f:
+            legacy_results = json.load(f)
+        for bill_id, result in legacy_results.items():
+            self.write(bill_id, result)
+        print(f"📥 Imported {len(legacy_results)} results from {legacy_results_path}")
+
+    def write(self, bill_id, result):
+        """Durably records one bill's result."""
+        line = (json.dumps({"bill_id": bill_id, "result": result}) + "\n").encode("utf-8")
+        with self.lock:
+            with open(self.sink_path, "ab") as f:
+                offset = f.tell()
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self.offsets[bill_id] = offset
+
+    def __contains__(self, bill_id):
+        return bill_id in self.offsets
+
+    def __len__(self):
+        return len(self.offsets)
+
+    @property
+    def bill_ids(self):
+        """Ids of the bills with a result (a live view)."""
+        return self.offsets.keys()
+
+    def get(self, bill_id):
+        """Reads one bill's latest result, or None."""
+        with self.lock:
+            offset = self.offsets.get(bill_id)
+            if offset is None:
+                return None
+            with open(self.sink_path, "rb") as f:
+                f.seek(offset)
+                return json.loads(f.readline())["result"]
+
+    def items(self):
+        """(bill_id, result) for every bill, latest results only, one line in memory at a time."""
+        with self.lock:
+            offsets = list(self.offsets.items())
+        with open(self.sink_path, "rb") as f:
+            for bill_id, offset in offsets:
+                f.seek(offset)
+                yield bill_id, json.loads(f.readline())["result"]
+
+    def export(self, output_path):
+        """
+        Writes {bill_id: result} to output_path exactly as json.dump(results, f, indent=4) would, one
+        result at a time, via a temporary file that is swapped in.
+        """
+        output_path = Path(output_path)
+        tmp_path = output_path.with_suffix(output_path.suffix + ".tmp")
+
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("{")
+            for i, (bill_id, result) in enumerate(self.items()):
+                # json.dumps of a one-entry dict, minus its braces, is the entry at the right indentation
+                f.write(("," if i else "") + "\n" + json.dumps({bill_id: result}, indent=4)[2:-2])
+            f.write("\n}" if self.offsets else "}")
+        os.replace(tmp_path, output_path)
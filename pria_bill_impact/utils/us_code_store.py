@@ -0,0 +1,240 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+from collections.abc import Mapping
+from pathlib import Path
+
+from utils.bill_mapping_cache import file_fingerprint
+
+
+def normalize_section_key(title_number, section_number):
+    """
+    Normalizes a (title, section) pair into the key sections are looked up by.
+
+    Citations and parsed U.S. Code sections don't always spell section numbers the same way,
+    so both sides go through this before comparing.
+    Example:
+    - ("42", "1320e-1")  → "42|1320e1"
+    - (5, "§ 8401(a)(1)") → "5|8401"
+    """
+    title = str(title_number or "").strip().lower()
+    section = str(section_number or "").strip().lower()
+
+    section = section.replace("§", "")
+    section = re.sub(r"\(.*$", "", section)  # Drop sub-section parentheticals, e.g. "(a)(1)"
+    section = re.sub(r"[\[\]\s.\-]", "", section)
+
+    return f"{title}|{section}"
+
+
+class USCodeStore(Mapping):
+    """
+    Read-only {section_identifier_full: section_data} mapping over a SQLite copy of the processed
+    U.S. Code sections, used instead of loading processed_uscode_sections.json into memory.
+
+    Title and chapter names are stored once per title/chapter instead of once per section, and section
+    content lives in its own table that is only read when a section is accessed, so opening the store
+    costs next to nothing no matter how many sections it holds. Sections are indexed by key and by
+    normalized (title, section), see lookup().
+
+    Each section's row_id is its 0-based position in the source file, the same position the FAISS
+    U.S. Code index records per row (lookup_rows), so USCodeMatcher reads its hits with section_at().
+
+    The store is built next to the sections file (processed_uscode_sections.sqlite) and rebuilt when
+    processed_uscode_sections.json or .jsonl changes. Sections are read from the JSON Lines output
+    when it exists, so building doesn't need the whole JSON in memory either.
+    """
+
+    def __init__(self, store_path):
+        self.store_path = Path(store_path)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(f"file:{self.store_path}?mode=ro", uri=True, check_same_thread=False)
+        self.length = self.conn.execute("SELECT COUNT(*) FROM sections").fetchone()[0]
+
+    @classmethod
+    def load_or_build(cls, sections_path, store_path=None):
+        """
+        Opens the store for sections_path, (re)building it first if it is missing or the sections file changed.
+
+        Args:
+            sections_path (str | Path): processed_uscode_sections.json. A .jsonl next to it is preferred as the build source.
+            store_path (str | Path): Defaults to processed_uscode_sections.sqlite next to sections_path.
+        """
+        sections_path = Path(sections_path)
+        store_path = Path(store_path) if store_path else sections_path.with_suffix(".sqlite")
+        source_paths = [sections_path, sections_path.with_suffix(".jsonl")]
+        fingerprints = json.dumps({str(path): file_fingerprint(path) for path in source_paths})
+
+        if store_path.exists():
+            conn = sqlite3.connect(f"file:{store_path}?mode=ro", uri=True)
+            try:
+                row = conn.execute("SELECT value FROM meta WHERE key = 'sources'").fetchone()
+            except sqlite3.DatabaseError:
+                row = None
+            finally:
+                conn.close()
+
+            # Without any source file, keep using whatever the store holds
+            if row and (row[0] == fingerprints or not any(path.exists() for path in source_paths)):
+                return cls(store_path)
+            print("🔄 Processed U.S. Code sections changed, rebuilding the section store...")
+
+        cls.build(source_paths, store_path, fingerprints)
+        return cls(store_path)
+
+    @staticmethod
+    def iter_source_sections(source_paths):
+        """Yields section dicts from the .jsonl source, or from the .json one if that is missing or newer."""
+        sections_path, jsonl_path = source_paths
+        if jsonl_path.exists() and (not sections_path.exists() or jsonl_path.stat().st_mtime >= sections_path.stat().st_mtime):
+            with open(jsonl_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+        elif sections_path.exists():
+            with open(sections_path, "r", encoding="utf-8") as f:
+                yield from json.load(f).values()
+        else:
+            print(f"JSON file not found: {sections_path}")
+
+    @classmethod
+    def build(cls, source_paths, store_path, fingerprints):
+        """Writes a new store to a temporary file and swaps it in, so open readers never see a half-built one."""
+        print(f"🔄 Building U.S. Code section store at {store_path}...")
+        store_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = store_path.with_suffix(".sqlite.tmp")
+        tmp_path.unlink(missing_ok=True)
+
+        conn = sqlite3.connect(str(tmp_path))
+        conn.executescript(
+            """
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE titles (title_id INTEGER PRIMARY KEY, title_number TEXT, title_name TEXT);
+            CREATE TABLE chapters (chapter_id INTEGER PRIMARY KEY, title_id INTEGER, chapter_number TEXT, chapter_name TEXT);
+            CREATE TABLE sections (
+                row_id INTEGER PRIMARY KEY,
+                section_key TEXT UNIQUE,
+                lookup_key TEXT,
+                chapter_id INTEGER,
+                act_name TEXT,
+                section_number TEXT,
+                section_name TEXT,
+                status TEXT
+            );
+            CREATE TABLE contents (row_id INTEGER PRIMARY KEY, content TEXT);
+            """
+        )
+
+        titles, chapters, rows = {}, {}, {}
+        for section in cls.iter_source_sections(source_paths):
+            title = (section.get("title_number", ""), section.get("title_name", ""))
+            if title not in titles:
+                titles[title] = len(titles)
+                conn.execute("INSERT INTO titles VALUES (?, ?, ?)", (titles[title], *title))
+
+            chapter = (titles[title], section.get("chapter_number", ""), section.get("chapter_name", ""))
+            if chapter not in chapters:
+                chapters[chapter] = len(chapters)
+                conn.execute("INSERT INTO chapters VALUES (?, ?, ?, ?)", (chapters[chapter], *chapter))
+
+            # A key seen again keeps its first position and takes the later values, like dict.update
+            section_key = section["section_identifier_full"]
+            row_id = rows.setdefault(section_key, len(rows))
+            conn.execute(
+                "INSERT OR REPLACE INTO sections VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    row_id, section_key,
+                    normalize_section_key(section.get("title_number"), section.get("section_number")),
+                    chapters[chapter], section.get("act_name", ""), section.get("section_number", ""),
+                    section.get("section_name", ""), section.get("status", "")
+                )
+            )
+            conn.execute("INSERT OR REPLACE INTO contents VALUES (?, ?)", (row_id, section.get("content", "")))
+
+        conn.execute("CREATE INDEX idx_sections_lookup_key ON sections (lookup_key)")
+        conn.execute("INSERT INTO meta VALUES ('sources', ?)", (fingerprints,))
+        conn.commit()
+        conn.close()
+
+        os.replace(tmp_path, store_path)
+        print(f"✅ Stored {len(rows)} sections ({len(titles)} titles, {len(chapters)} chapters).")
+
+    # Columns of a section dict, in the order us_code_processor writes them
+    SECTION_QUERY = """
+        SELECT s.row_id, t.title_number, t.title_name, c.chapter_number, c.chapter_name, s.act_name,
+               s.section_number, s.section_name, n.content, s.status, s.section_key
+        FROM sections s
+        JOIN chapters c ON c.chapter_id = s.chapter_id
+        JOIN titles t ON t.title_id = c.title_id
+        JOIN contents n ON n.row_id = s.row_id
+    """
+
+    def _query(self, where, params=()):
+        with self.lock:
+            return self.conn.execute(self.SECTION_QUERY + where, params).fetchall()
+
+    @staticmethod
+    def _to_section(row):
+        return {
+            "title_number": row[1],
+            "title_name": row[2],
+            "chapter_number": row[3],
+            "chapter_name": row[4],
+            "act_name": row[5],
+            "section_number": row[6],
+            "section_name": row[7],
+            "content": row[8],
+            "status": row[9],
+            "section_identifier_full": row[10]
+        }
+
+    def __getitem__(self, section_key):
+        rows = self._query("WHERE s.section_key = ?", (section_key,))
+        if not rows:
+            raise KeyError(section_key)
+        return self._to_section(rows[0])
+
+    def __contains__(self, section_key):
+        with self.lock:
+            return self.conn.execute("SELECT 1 FROM sections WHERE section_key = ?", (section_key,)).fetchone() is not None
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        """Section keys in row_id (source file) order."""
+        with self.lock:
+            keys = self.conn.execute("SELECT section_key FROM sections ORDER BY row_id").fetchall()
+        for (section_key,) in keys:
+            yield section_key
+
+    def items(self, batch_size=1000):
+        """(section_key, section_data) in row_id order, read batch_size sections at a time."""
+        last_row_id = -1
+        while True:
+            rows = self._query("WHERE s.row_id > ? ORDER BY s.row_id LIMIT ?", (last_row_id, batch_size))
+            if not rows:
+                return
+            for row in rows:
+                yield row[10], self._to_section(row)
+            last_row_id = rows[-1][0]
+
+    def section_at(self, row_id):
+        """The section stored at row_id (its position in the source file), or None."""
+        rows = self._query("WHERE s.row_id = ?", (int(row_id),))
+        return self._to_section(rows[0]) if rows else None
+
+    def lookup(self, title_number, section_number):
+        """
+        Finds the U.S. Code sections for a citation. Sub-section citations such as "102(a)(1)"
+        resolve to their parent section "102".
+
+        Returns:
+            List[Tuple[str, Dict]]: (section_key, section_data) pairs.
+        """
+        rows = self._query(
+            "WHERE s.lookup_key = ? ORDER BY s.row_id", (normalize_section_key(title_number, section_number),)
+        )
+        return [(row[10], self._to_section(row)) for row in rows]